@@ -17,6 +17,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError as PydanticValidationError
+import asyncio
 import logging
 import os
 import sys
@@ -37,6 +38,9 @@ from microservice.agent_boilerplate.boilerplate.errors import (
 # Import auth middleware
 from auth_middleware import AuthMiddleware
 
+# Import SSE compression middleware
+from compression_middleware import CompressionMiddleware
+
 # Import routes from agent_backend microservice
 from microservice.mcp_tools.routes.tools import router as tools_router
 from microservice.agent_backend.routes.agents import router as agents_router
@@ -124,6 +128,9 @@ app.add_middleware(
 # Add authentication middleware
 app.add_middleware(AuthMiddleware, supabase_client=supabase)
 
+# Compress SSE streams frame by frame, and other text responses as a whole
+app.add_middleware(CompressionMiddleware, minimum_size=256)
+
 # Include all routers
 ROUTERS = [
     tools_router,
@@ -395,6 +402,22 @@ async def list_models():
             "note": "Add OPENROUTER_API_KEY or OPENAI_API_KEY to .env to use cloud models"
         }
 
+# Shutdown event: close shared HTTP clients
+@app.on_event("shutdown")
+async def shutdown_event():
+    from microservice.agent_creator.utils.mcphub_compass import close_session
+    from microservice.agent_boilerplate.boilerplate.utils.get_llms import close_http_async_client
+    from microservice.agent_field_autofill.agent_field_autofill import agent_field_autofill
+    
+    # Stop a warm-up that is still running before closing the clients it uses
+    warmup_task = getattr(app.state, "llm_warmup_task", None)
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    
+    await agent_field_autofill.shutdown()
+    await close_session()
+    await close_http_async_client()
+
 # Startup event: initialize roles and refresh tools
 @app.on_event("startup")
 async def startup_event():
@@ -430,6 +453,22 @@ async def startup_event():
     subprocess.Popen([sys.executable, "./microservice/mcp_2/mcp_auto_manager.py"])
     logger.info("Started MCP auto manager")
 
+    # Create the autofill service's shared resources before the first request
+    from microservice.agent_field_autofill.agent_field_autofill import agent_field_autofill
+    
+    await agent_field_autofill.startup()
+    
+    # Warm up LLMs in the background so startup isn't blocked by model loading
+    if os.getenv("LLM_WARMUP_ON_STARTUP", "true").lower() == "true":
+        from microservice.agent_boilerplate.boilerplate.utils.get_llms import warm_up_llms
+        
+        app.state.llm_warmup_task = asyncio.create_task(
+            warm_up_llms(
+                int(os.getenv("LLM_WARMUP_CONNECTIONS", "4")),
+                load_custom_vlm=os.getenv("LLM_WARMUP_LOAD_VLM", "false").lower() == "true"
+            )
+        )
+
 # Exception handlers
 @app.exception_handler(APIError)
 async def api_error_handler(request: Request, exc: APIError):
@@ -458,8 +497,8 @@ async def pydantic_validation_exception_handler(request: Request, exc: PydanticV
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle any unhandled exceptions"""
-    # Log the error here
-    logger.error("Unhandled exception: %s", exc)
+    # Log the error here, with the route it came from
+    logger.error("Unhandled exception on %s %s: %s", request.method, request.url.path, exc)
     error = InternalServerError(f"An unexpected error occurred")
     return JSONResponse(
         status_code=error.status_code,
@@ -474,4 +513,17 @@ if __name__ == "__main__":
     # })
     
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8080)
\ No newline at end of file
+    
+    # Use uvloop and httptools when installed (falls back to asyncio and h11 otherwise)
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+    
+    uvicorn.run(app, host="0.0.0.0", port=8080, loop=loop, http=http)
\ No newline at end of file
@@ -2,6 +2,9 @@ from fastapi import Request, HTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi.responses import Response, RedirectResponse
 from supabase import Client
+from cachetools import TTLCache
+from typing import Optional
+import hashlib
 import json
 
 # Define public and protected routes
@@ -21,6 +24,7 @@ class AuthMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
         self.supabase = supabase_client
         self.processed_users = set()  # Track which users have already been processed
+        self.user_cache = TTLCache(maxsize=4096, ttl=60)  # Resolved users keyed by token digest
 
     async def dispatch(self, request: Request, call_next):
         # Allow CORS preflight requests (OPTIONS) to pass through without authentication
@@ -40,18 +44,7 @@ class AuthMiddleware(BaseHTTPMiddleware):
             jwt_token = authorization.replace("Bearer ", "")
 
             try: 
-                flag_bypass = True
-                if flag_bypass:
-                    # Load JSON from a file
-                    with open("./others/user_jwt/user_static.json", "r") as file:
-                        response = json.load(file)
-                        print(response)
-                else:
-                    # Fetch user from Supabase
-                    print(jwt_token)
-                    response = self.supabase.auth.get_user(jwt_token)
-                    response = response.dict()
-                
+                response = self._get_user(jwt_token)
                 
                 request.state.user = response["user"]
                 request.state.user_id = response["user"]["id"]
@@ -129,6 +122,30 @@ class AuthMiddleware(BaseHTTPMiddleware):
 
         return response
         
+    def _get_user(self, jwt_token: str) -> dict:
+        """
+        Resolve the user for a JWT, reusing recent lookups for the same token.
+        """
+        cache_key = hashlib.sha256(jwt_token.encode()).digest()
+        response = self.user_cache.get(cache_key)
+        if response is not None:
+            return response
+        
+        flag_bypass = True
+        if flag_bypass:
+            # Load JSON from a file
+            with open("./others/user_jwt/user_static.json", "r") as file:
+                response = json.load(file)
+                print(response)
+        else:
+            # Fetch user from Supabase
+            print(jwt_token)
+            response = self.supabase.auth.get_user(jwt_token)
+            response = response.dict()
+        
+        self.user_cache[cache_key] = response
+        return response
+        
     async def _ensure_user_in_predefined_company(self, user_id):
         """
         Check if user is already a member of the "Predefined" company.
@@ -204,3 +221,11 @@ class AuthMiddleware(BaseHTTPMiddleware):
         except Exception as e:
             # Log the error but don't fail the request
             print(f"Error in _ensure_user_in_predefined_company: {str(e)}")
+
+def get_current_user_id(request: Request) -> Optional[str]:
+    """
+    Dependency exposing the authenticated user's ID, as set by AuthMiddleware.
+    
+    Returns None on routes the middleware does not authenticate.
+    """
+    return getattr(request.state, "user_id", None)
@@ -0,0 +1,91 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import zlib
+
+# Content types worth compressing; anything else (images, archives, PDFs,
+# application/octet-stream, ...) is binary or already compressed
+COMPRESSIBLE_CONTENT_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Middleware for gzip-compressing text responses
+class CompressionMiddleware:
+    """
+    Gzip-compress text responses, leaving binary and pre-encoded ones untouched.
+
+    text/event-stream responses are compressed one frame at a time: every body
+    chunk is followed by a sync flush, so the client can decode each event as
+    soon as it arrives instead of waiting for the stream to end. Other
+    compressible responses are compressed as a whole, unless they are a single
+    body smaller than minimum_size.
+    """
+    def __init__(self, app: ASGIApp, minimum_size: int = 256, compresslevel: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        sync_flush = False
+
+        async def send_compressed(message: Message):
+            nonlocal start_message, compressor, sync_flush
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                content_type = headers.get("content-type", "")
+                if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+                    await send(message)
+                    return
+                # Hold the headers until the first body chunk shows whether to compress
+                start_message = message
+                sync_flush = content_type.startswith("text/event-stream")
+                return
+
+            if message["type"] != "http.response.body" or (start_message is None and compressor is None):
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                start, start_message = start_message, None
+                if not more_body and not sync_flush and len(body) < self.minimum_size:
+                    await send(start)
+                    await send(message)
+                    return
+                # wbits=31 produces a gzip container
+                compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 31)
+                headers = MutableHeaders(raw=list(start.get("headers", [])))
+                headers["Content-Encoding"] = "gzip"
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["content-length"]
+                start["headers"] = headers.raw
+                if not more_body:
+                    body = compressor.compress(body) + compressor.flush()
+                    headers["Content-Length"] = str(len(body))
+                    start["headers"] = headers.raw
+                    message["body"] = body
+                    await send(start)
+                    await send(message)
+                    return
+                await send(start)
+
+            body = compressor.compress(body)
+            if not more_body:
+                body += compressor.flush()
+            elif sync_flush:
+                body += compressor.flush(zlib.Z_SYNC_FLUSH)
+            message["body"] = body
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,6 @@
+"""
+Pytest configuration.
+
+Having this file at the project root puts the root on sys.path, so tests can
+import the `microservice` and `others` packages the same way app.py does.
+"""
@@ -10,6 +10,7 @@ import torch.nn as nn
 import torch.nn.functional as F
 import warnings
 import os
+import threading
 from typing import Any, List, Optional
 from PIL import Image
 from pathlib import Path
@@ -426,13 +427,18 @@ class CustomVLMLLM(LLM):
 # ===============================================================
 
 _custom_vlm_instance = None
+# Guards model construction so concurrent callers (e.g. the startup warm-up thread
+# and a request) don't build the model twice
+_custom_vlm_lock = threading.Lock()
 
 
 def get_custom_vlm_model() -> CustomVLMLLM:
     """Get or create the global custom VLM model instance."""
     global _custom_vlm_instance
     if _custom_vlm_instance is None:
-        _custom_vlm_instance = CustomVLMLLM()
+        with _custom_vlm_lock:
+            if _custom_vlm_instance is None:
+                _custom_vlm_instance = CustomVLMLLM()
     return _custom_vlm_instance
 
 async def _maybe_handle_multimodal_and_augment(agent_input, max_new_tokens=64, model_name=None):
@@ -1,10 +1,78 @@
 from .custom_vlm_model import get_custom_vlm_model
 from langchain_openai import ChatOpenAI
+from functools import lru_cache
+import asyncio
+import httpx
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared async HTTP client so cloud LLM calls reuse keep-alive connections
+_http_async_client = None
+
+# Connection pool limits and timeouts (seconds) for cloud LLM calls; long streams
+# need a generous read timeout, while waiting for a pooled connection should fail fast
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "2000"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "1500"))
+LLM_HTTP_TIMEOUT = httpx.Timeout(
+    connect=float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "10")),
+    read=float(os.getenv("LLM_HTTP_READ_TIMEOUT", "120")),
+    write=float(os.getenv("LLM_HTTP_WRITE_TIMEOUT", "30")),
+    pool=float(os.getenv("LLM_HTTP_POOL_TIMEOUT", "5"))
+)
+
+def _get_http_async_client() -> httpx.AsyncClient:
+    """Get or create the pooled async HTTP client used by ChatOpenAI instances."""
+    global _http_async_client
+    if _http_async_client is None:
+        _http_async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+                max_connections=LLM_HTTP_MAX_CONNECTIONS
+            ),
+            timeout=LLM_HTTP_TIMEOUT
+        )
+    return _http_async_client
+
+async def close_http_async_client() -> None:
+    """Close the shared LLM HTTP client (called on application shutdown)."""
+    global _http_async_client
+    if _http_async_client is not None:
+        await _http_async_client.aclose()
+        _http_async_client = None
+
+async def warm_up_llms(connections: int = 4, load_custom_vlm: bool = False) -> None:
+    """
+    Open pooled LLM connections (and optionally load the local model) before traffic arrives.
+    
+    When a MaiaRouter key is configured, a few parallel HEAD requests prime the
+    shared keep-alive pool so the first cloud request doesn't pay the TCP/TLS
+    handshake. Failures are logged and otherwise ignored.
+    
+    Args:
+        connections: Number of keep-alive connections to open to MaiaRouter
+        load_custom_vlm: Whether to also load the custom VLM in a worker thread;
+                         skipped when VLM_ENDPOINTS is set, since autofill then
+                         uses the remote endpoints instead
+    """
+    warmups = []
+    if load_custom_vlm and not os.getenv("VLM_ENDPOINTS"):
+        warmups.append(asyncio.to_thread(get_custom_vlm_model))
+    if os.getenv("MAIAROUTER_API_KEY"):
+        client = _get_http_async_client()
+        base_url = os.getenv("MAIAROUTER_BASE_URL", "https://api.maiarouter.ai/v1")
+        warmups.extend(client.head(base_url) for _ in range(connections))
+    
+    if not warmups:
+        return
+    
+    results = await asyncio.gather(*warmups, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("LLM warm-up step failed: %s", result)
+    logger.info("LLM warm-up complete")
+
 def get_llms(model_name: str="custom-vlm", temperature=0):
     """
     Helper function to get LLM instance.
@@ -55,6 +123,7 @@ def get_llms(model_name: str="custom-vlm", temperature=0):
             model=model_name,
             temperature=temperature,
             streaming=True,
+            http_async_client=_get_http_async_client(),
             model_kwargs={
                 "extra_headers": {
                     "HTTP-Referer": "https://github.com/yourusername/ponzgen",
@@ -75,10 +144,31 @@ def get_llms(model_name: str="custom-vlm", temperature=0):
             api_key=openai_key,
             model=model_name,
             temperature=temperature,
-            streaming=True
+            streaming=True,
+            http_async_client=_get_http_async_client()
         )
     
     # Fallback to custom VLM
     else:
         print(f"Unknown model: {model_name}. Falling back to custom VLM.")
-        return get_custom_vlm_model()
\ No newline at end of file
+        return get_custom_vlm_model()
+
+@lru_cache(maxsize=32)
+def _get_cached_llms(model_name: str, temperature: float):
+    return get_llms(model_name, temperature)
+
+def get_cached_llms(model_name: str = "custom-vlm", temperature=0):
+    """
+    Get a shared LLM instance for the given model and temperature.
+    
+    Instances are stateless, so one per (model_name, temperature) pair is
+    built and reused instead of constructing a new client on every call.
+    
+    Args:
+        model_name: The name of the model to use (see get_llms)
+        temperature: Temperature setting for the model
+        
+    Returns:
+        A configured LLM instance
+    """
+    return _get_cached_llms(model_name, round(float(temperature), 3))
@@ -5,7 +5,7 @@ This module provides routes for agent invocation.
 """
 
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from typing import Dict, Any, Tuple, Optional
 from uuid import UUID
 from supabase import Client
@@ -27,7 +27,8 @@ from ..boilerplate.errors import (
 router = APIRouter(
     prefix="/agent-invoke",
     tags=["agent-invoke"],
-    responses={**ERROR_RESPONSES}
+    responses={**ERROR_RESPONSES},
+    default_response_class=ORJSONResponse
 )
 
 # Dependency to get Supabase client
@@ -688,24 +689,23 @@ async def get_shared_agent(
         
         agent = agent_response.data[0]
         
-        # Get tool details
+        # Get tool details in a single query, keeping the agent's tool order
         tool_details = []
-        for tool_id in agent.get("tools", []):
-            print(f"Looking up tool_id: {tool_id}")
+        tool_ids = agent.get("tools") or []
+        if tool_ids:
             try:
                 tool_response = (
                     supabase.table("tools_with_decrypted_keys")
                     .select("tool_id, name, description, versions")
-                    .eq("tool_id", tool_id)
+                    .in_("tool_id", tool_ids)
                     .execute()
                 )
-                print(f"tool_response for {tool_id}: {tool_response}")
             except Exception as e:
-                print(f"Error fetching tool details for {tool_id}: {str(e)}")
+                print(f"Error fetching tool details for {tool_ids}: {str(e)}")
                 raise InternalServerError(f"Error fetching tool details: {str(e)}")
             
-            if tool_response.data:
-                tool_details.append(tool_response.data[0])
+            tools_by_id = {str(tool["tool_id"]): tool for tool in tool_response.data or []}
+            tool_details = [tools_by_id[str(tool_id)] for tool_id in tool_ids if str(tool_id) in tools_by_id]
         
         # Fetch the latest chat_history from agent_logs
         chat_history = []
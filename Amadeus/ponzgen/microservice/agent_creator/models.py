@@ -31,4 +31,15 @@ class RecommendationResponse(BaseModel):
     """Response for field autofill."""
     field_name: str
     autofilled_value: Any
-    reasoning: Optional[str] = None
\ No newline at end of file
+    reasoning: Optional[str] = None
+
+class BatchRecommendationInput(BaseModel):
+    """Input for autofilling several fields at once."""
+    field_names: List[str] = Field(..., min_length=1, description="The names of the fields to generate")
+    json_field: Dict[str, Any] = Field(..., description="JSON object containing other field values")
+    existing_field_values: Dict[str, str] = Field(default_factory=dict, description="Existing values of the fields to continue from, keyed by field name")
+    return_tool_ids: Optional[bool] = Field(default=True, description="Whether to return tool IDs instead of names for tools field")
+
+class BatchRecommendationResponse(BaseModel):
+    """Response for batch field autofill."""
+    results: List[RecommendationResponse]
\ No newline at end of file
@@ -5,29 +5,43 @@ This module provides routes for field autofill generation.
 """
 
 from fastapi import APIRouter, Request, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from typing import Dict, Any, List, Optional
 import json
-import traceback
+import logging
+import orjson
 from supabase import Client
 from pydantic import ValidationError as PydanticValidationError
 from uuid import UUID
 
-from ..models import RecommendationInput, RecommendationResponse, Tool
+from ..models import (
+    RecommendationInput, RecommendationResponse, Tool,
+    BatchRecommendationInput, BatchRecommendationResponse
+)
 from ..tool_autofill import tool_autofill
+from ..utils.error_sampler import ErrorSampler
 from ...agent_boilerplate.boilerplate.errors import (
     BadRequestError, NotFoundError, ValidationError, 
     InternalServerError, handle_pydantic_validation_error, ERROR_RESPONSES
 )
 from ...mcp_tools.routes.tools import get_supabase_client, get_tools
+from auth_middleware import get_current_user_id
 
 # Create router
 router = APIRouter(
     prefix="/agent-creator-autofill",
     tags=["agent-creator-autofill"],
-    responses={**ERROR_RESPONSES}
+    responses={**ERROR_RESPONSES},
+    default_response_class=ORJSONResponse
 )
 
+logger = logging.getLogger(__name__)
+
+# Fields whose autofill consumes the available tools list
+_TOOL_FIELDS = frozenset({"tools", "mcphub_recommended_tools"})
+
+_error_sampler = ErrorSampler()
+
 async def fetch_tools_from_db(supabase: Client, user_id: str, company_id: Optional[str] = None) -> List[Tool]:
     """Helper function to fetch tools from the database via get_tools endpoint.
     
@@ -45,7 +59,7 @@ async def fetch_tools_from_db(supabase: Client, user_id: str, company_id: Option
                 self.query_params = {}
         
         if not user_id:
-            print("Warning: No user_id provided")
+            logger.warning("No user_id provided")
             return []
             
         mock_request = MockRequest(user_id)
@@ -75,13 +89,14 @@ async def fetch_tools_from_db(supabase: Client, user_id: str, company_id: Option
                     company_id=tool.get("company_id")  # Include company_id
                 ))
             except Exception as e:
-                print(f"Error creating Tool object: {str(e)}")
+                if _error_sampler.should_emit(f"tool:{type(e).__name__}"):
+                    logger.warning("Error creating Tool object: %s", e)
                 continue
                 
         return sorted(tools, key=lambda x: x.name.lower())
     except Exception as e:
-        print(f"Failed to fetch tools from database: {str(e)}")
-        print(traceback.format_exc())
+        if _error_sampler.should_emit(f"fetch:{type(e).__name__}"):
+            logger.exception("Failed to fetch tools from database")
         return []
 
 def _verify_json_serialization(data: Any) -> Any:
@@ -90,7 +105,7 @@ def _verify_json_serialization(data: Any) -> Any:
         json.dumps(data)
         return data
     except Exception as e:
-        print(f"Data serialization error: {str(e)}")
+        logger.warning("Data serialization error: %s", e)
         
         # Handle different types of data
         if isinstance(data, dict):
@@ -100,7 +115,7 @@ def _verify_json_serialization(data: Any) -> Any:
                     json.dumps({key: value})
                     sanitized_dict[key] = value
                 except:
-                    print(f"Field {key} couldn't be serialized, using empty string")
+                    logger.warning("Field %s couldn't be serialized, using empty string", key)
                     sanitized_dict[key] = ""
             return sanitized_dict
         elif isinstance(data, list):
@@ -119,8 +134,8 @@ async def _parse_recommendation_input(request: Request) -> RecommendationInput:
             json_field_str = request.query_params.get("json_field", "{}")
             
             try:
-                json_field = json.loads(json_field_str)
-            except json.JSONDecodeError:
+                json_field = orjson.loads(json_field_str)
+            except orjson.JSONDecodeError:
                 raise BadRequestError("Invalid JSON in json_field parameter")
                 
             existing_field_value = request.query_params.get("existing_field_value", "")
@@ -135,14 +150,14 @@ async def _parse_recommendation_input(request: Request) -> RecommendationInput:
             if not field_name:
                 raise BadRequestError("field_name is required")
         else:
-            # POST request with a JSON body
+            # POST request with a JSON body, validated straight from the raw bytes
+            body = await request.body()
             try:
-                data = await request.json()
-                return RecommendationInput(**data)
+                return RecommendationInput.model_validate_json(body)
             except PydanticValidationError as e:
+                if any(error["type"] == "json_invalid" for error in e.errors()):
+                    raise BadRequestError("Invalid JSON in request body")
                 raise handle_pydantic_validation_error(e)
-            except json.JSONDecodeError:
-                raise BadRequestError("Invalid JSON in request body")
         
         # Return validated model for GET requests
         if request_method == "GET":
@@ -161,11 +176,10 @@ async def _parse_recommendation_input(request: Request) -> RecommendationInput:
 
 async def _prepare_autofill_params(
     request: Request, 
-    supabase: Client
+    supabase: Client,
+    user_id: Optional[str]
 ) -> tuple[str, Dict, str, List[Tool], bool]:
     """Prepare parameters needed for autofill generation."""
-    # Get user_id from request state (set by middleware)
-    user_id = request.state.user_id
     if not user_id:
         raise BadRequestError("User ID not found in request state")
     
@@ -177,16 +191,18 @@ async def _prepare_autofill_params(
     return_tool_ids = recommendation_input.return_tool_ids
     
     # Default to empty tools list
-    available_tools = []
+    available_tools: List[Tool] = []
     
-    # If this is the tools field, fetch all tools from the database
-    if field_name in ["tools", "mcphub_recommended_tools"]:
-        # Log the request data for debugging
-        print(f"Tool autofill request for {field_name}. JSON field: {json_field}")
-        
-        # Fetch all available tools from the database
-        available_tools = await fetch_tools_from_db(supabase, user_id, None)
-        print(f"Fetched {len(available_tools)} tools from database for autofill")
+    # Only tool fields need the tools list; skip the database entirely otherwise
+    if field_name not in _TOOL_FIELDS:
+        return field_name, json_field, existing_field_value, available_tools, return_tool_ids
+    
+    # Log the request data for debugging
+    print(f"Tool autofill request for {field_name}. JSON field: {json_field}")
+    
+    # Fetch all available tools from the database
+    available_tools = await fetch_tools_from_db(supabase, user_id, None)
+    print(f"Fetched {len(available_tools)} tools from database for autofill")
         
     # If tools list is not empty, ensure it's serializable
     if available_tools:
@@ -206,7 +222,8 @@ async def _prepare_autofill_params(
 async def get_available_tools(
     request: Request,
     company_id: Optional[str] = Query(None, description="Optional company ID to filter tools by"),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: Client = Depends(get_supabase_client),
+    user_id: Optional[str] = Depends(get_current_user_id)
 ):
     """
     Get all available tools that can be used by agents.
@@ -223,8 +240,6 @@ async def get_available_tools(
         List[Tool]: List of available tools with their details
     """
     try:
-        user_id = request.state.user_id
-        
         # Query tools from Supabase with optional company filter
         tools = await fetch_tools_from_db(supabase, user_id, company_id)
         return tools
@@ -234,7 +249,8 @@ async def get_available_tools(
 @router.post("/invoke", response_model=RecommendationResponse)
 async def invoke_autofill(
     request: Request,
-    supabase: Client = Depends(get_supabase_client)
+    supabase: Client = Depends(get_supabase_client),
+    user_id: Optional[str] = Depends(get_current_user_id)
 ):
     """
     Autofill a field based on other field values.
@@ -243,7 +259,7 @@ async def invoke_autofill(
     """
     try:
         field_name, json_field, existing_field_value, available_tools, return_tool_ids = (
-            await _prepare_autofill_params(request, supabase)
+            await _prepare_autofill_params(request, supabase, user_id)
         )
         
         # Generate the autofill
@@ -275,3 +291,51 @@ async def invoke_autofill(
         raise
     except Exception as e:
         raise InternalServerError(f"Unexpected error: {str(e)}")
+
+@router.post("/autofill-batch", response_model=BatchRecommendationResponse)
+async def invoke_autofill_batch(
+    batch_input: BatchRecommendationInput,
+    supabase: Client = Depends(get_supabase_client),
+    user_id: Optional[str] = Depends(get_current_user_id)
+):
+    """
+    Autofill several fields in a single request.
+    
+    The fields are generated concurrently, so a form that needs both tools and
+    MCPHUB recommendations waits for the slowest one instead of their sum.
+    """
+    try:
+        if not user_id:
+            raise BadRequestError("User ID not found in request state")
+        
+        json_field = _verify_json_serialization(batch_input.json_field)
+        
+        # Fetch tools once, and only if a tool field was requested
+        available_tools: List[Tool] = []
+        if _TOOL_FIELDS.intersection(batch_input.field_names):
+            available_tools = await fetch_tools_from_db(supabase, user_id, None)
+        
+        results = await tool_autofill.generate_autofills_batch(
+            field_names=batch_input.field_names,
+            json_field=json_field,
+            available_tools=available_tools,
+            existing_field_values=batch_input.existing_field_values,
+            return_tool_ids=batch_input.return_tool_ids
+        )
+        
+        responses = []
+        for field_name, result in zip(batch_input.field_names, results):
+            if isinstance(result, BaseException):
+                responses.append({
+                    "field_name": field_name,
+                    "autofilled_value": "",
+                    "reasoning": f"Failed to generate autofill: {str(result)}"
+                })
+            else:
+                responses.append(result)
+        
+        return {"results": responses}
+    except (BadRequestError, ValidationError, InternalServerError):
+        raise
+    except Exception as e:
+        raise InternalServerError(f"Unexpected error: {str(e)}")
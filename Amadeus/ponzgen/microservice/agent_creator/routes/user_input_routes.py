@@ -4,27 +4,31 @@ User Input Parser Router
 This module provides routes for parsing user input to extract agent field information.
 """
 
-from fastapi import APIRouter, Request, Depends, HTTPException
-from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict, Any, List, Optional, AsyncGenerator, Tuple
 from pydantic import BaseModel, Field
-from fastapi.responses import StreamingResponse
-import json
-import asyncio
+from fastapi.responses import StreamingResponse, Response, ORJSONResponse
+import orjson
 
-from supabase import Client
+try:
+    from sse_starlette.sse import EventSourceResponse
+except ImportError:
+    EventSourceResponse = None
 
 from ..utils.input_parser import (
     extract_fields_from_input,
     extract_fields_from_input_stream,
     extract_keywords_from_agent,
+    extract_fields_and_keywords,
+    parse_and_recommend,
     parse_multi_agent_input
 )
 from ...agent_boilerplate.boilerplate.errors import (
-    BadRequestError, NotFoundError, ValidationError, 
-    InternalServerError, ERROR_RESPONSES
+    BadRequestError, NotFoundError, ERROR_RESPONSES
 )
 
-from microservice.agent_field_autofill.utils.field_utils import load_field_descriptions
+from microservice.agent_field_autofill.utils.field_utils import load_field_descriptions, load_field_names
+from auth_middleware import get_current_user_id
 
 # Define request and response models with common base class
 class BaseParserRequest(BaseModel):
@@ -45,40 +49,79 @@ class EnrichDataRequest(BaseParserRequest):
     """Request for enriching partial data with information from user input."""
     partial_data: Dict[str, Any] = Field(..., description="Existing partial agent data")
 
+# Dependency functions
+def require_user_id(user_id: Optional[str] = Depends(get_current_user_id)) -> str:
+    """Validate that user_id exists in request state."""
+    if not user_id:
+        raise BadRequestError("User ID not found in request state")
+    return user_id
+
 # Create router
 router = APIRouter(
     prefix="/user-input",
+    dependencies=[Depends(require_user_id)],
     tags=["user-input"],
-    responses={**ERROR_RESPONSES}
+    responses={**ERROR_RESPONSES},
+    default_response_class=ORJSONResponse
 )
 
-# Dependency functions
-def get_supabase_client(request: Request) -> Client:
-    """Get Supabase client from request state."""
-    return request.app.state.supabase
+# Serialized field metadata payloads and the descriptions dict they were built from
+_field_payload_cache: Tuple[Optional[Dict[str, str]], bytes, Dict[str, bytes]] = (None, b"", {})
 
-def _validate_user_id(request: Request) -> str:
-    """Validate that user_id exists in request state."""
-    user_id = request.state.user_id
-    if not user_id:
-        raise BadRequestError("User ID not found in request state")
-    return user_id
+def _get_field_payloads() -> Tuple[bytes, Dict[str, bytes]]:
+    """
+    Get the pre-serialized /field-metadata body and per-field description bodies.
+    
+    The payloads are rebuilt only when the cached field descriptions change.
+    
+    Returns:
+        Tuple of (metadata JSON bytes, dict mapping field names to description JSON bytes)
+    """
+    global _field_payload_cache
+    field_descriptions = load_field_descriptions()
+    source, metadata_bytes, description_bytes = _field_payload_cache
+    if source is not field_descriptions:
+        metadata_bytes = orjson.dumps({
+            "fields": load_field_names(),
+            "descriptions": field_descriptions
+        })
+        description_bytes = {
+            field_name: orjson.dumps({"field_name": field_name, "description": description})
+            for field_name, description in field_descriptions.items()
+        }
+        _field_payload_cache = (field_descriptions, metadata_bytes, description_bytes)
+    return metadata_bytes, description_bytes
+
+# Interval between keep-alive pings on SSE streams (seconds)
+SSE_PING_INTERVAL = 15
 
-# Error handling helper
-def _handle_error(e: Exception, context: str) -> None:
-    """Handle and re-raise errors with appropriate context."""
-    if isinstance(e, (BadRequestError, ValidationError, NotFoundError, InternalServerError)):
-        raise
-    else:
-        raise InternalServerError(f"Failed to {context}: {str(e)}")
+def _sse_response(events: AsyncGenerator[Dict[str, str], None]):
+    """
+    Wrap an async generator of {"event", "data"} dicts in an SSE response.
+    
+    Uses EventSourceResponse (keep-alive pings, no-cache and no-buffering headers)
+    when sse-starlette is installed, and a plain StreamingResponse otherwise.
+    """
+    if EventSourceResponse is not None:
+        return EventSourceResponse(events, ping=SSE_PING_INTERVAL, sep="\n")
+    
+    async def _frames():
+        async for event in events:
+            yield f"event: {event['event']}\ndata: {event['data']}\n\n"
+    
+    return StreamingResponse(
+        _frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # Route handlers
+# Handlers return ORJSONResponse directly so plain dict payloads skip
+# FastAPI's response validation and jsonable_encoder pass
 
 @router.post("/parse-stream")
 async def parse_user_input_stream(
-    request: Request,
-    parse_request: UserInputParseRequest,
-    supabase: Client = Depends(get_supabase_client)
+    parse_request: UserInputParseRequest
 ):
     """
     Stream the parsing of user input to extract field information.
@@ -86,91 +129,63 @@ async def parse_user_input_stream(
     This endpoint takes natural language input and streams the extracted field values
     as they are generated.
     """
-    try:
-        _validate_user_id(request)
-        
-        async def _event_generator():
-            """Generate SSE events with field updates."""
-            async for field_update in extract_fields_from_input_stream(
-                user_input=parse_request.user_input,
-                model_name=parse_request.model_name,
-                temperature=parse_request.temperature
-            ):
-                for field, value in field_update.items():
-                    # Send each field update as a separate event
-                    yield f"event: field_update\ndata: {{\"{field}\": {json.dumps(value)}}}\n\n"
-                    
-                    # Small delay to prevent overwhelming the client
-                    await asyncio.sleep(0.01)
-            
-            # Signal completion
-            yield "event: done\ndata: [DONE]\n\n"
+    async def _event_generator():
+        """Generate SSE events with field updates."""
+        async for field_update in extract_fields_from_input_stream(
+            user_input=parse_request.user_input,
+            model_name=parse_request.model_name,
+            temperature=parse_request.temperature
+        ):
+            if not field_update:
+                continue
+            # Send all fields of an update in a single event
+            yield {"event": "field_update", "data": orjson.dumps(field_update).decode()}
         
-        return StreamingResponse(
-            _event_generator(),
-            media_type="text/event-stream"
-        )
-    except Exception as e:
-        _handle_error(e, "stream parse user input")
+        # Signal completion
+        yield {"event": "done", "data": "[DONE]"}
+    
+    return _sse_response(_event_generator())
 
-@router.post("/parse-field", response_model=Dict[str, Any])
+@router.post("/parse-field")
 async def parse_field_from_input(
-    request: Request,
-    field_request: FieldParseRequest,
-    supabase: Client = Depends(get_supabase_client)
-):
+    field_request: FieldParseRequest
+) -> ORJSONResponse:
     """
     Parse user input to extract information for a specific field.
     
     This endpoint takes natural language input and a field name, and returns the extracted value.
     """
     try:
-        _validate_user_id(request)
-        
-        try:
-            field_value = await extract_fields_from_input(
-                user_input=field_request.user_input,
-                target_fields=[field_request.field_name],
-                model_name=field_request.model_name,
-                temperature=field_request.temperature
-            )
-            
-            return {field_request.field_name: field_value.get(field_request.field_name, "")}
-        except ValueError as e:
-            raise NotFoundError(str(e))
-        
-    except Exception as e:
-        _handle_error(e, "parse field from user input")
+        field_value = await extract_fields_from_input(
+            user_input=field_request.user_input,
+            target_fields=[field_request.field_name],
+            model_name=field_request.model_name,
+            temperature=field_request.temperature
+        )
+    except ValueError as e:
+        raise NotFoundError(str(e))
+    
+    return ORJSONResponse(content={field_request.field_name: field_value.get(field_request.field_name, "")})
 
-@router.get("/field-description/{field_name}", response_model=Dict[str, str])
+@router.get("/field-description/{field_name}", response_class=Response)
 async def get_field_description(
-    request: Request,
-    field_name: str,
-    supabase: Client = Depends(get_supabase_client)
+    field_name: str
 ):
     """
     Get the description for a specific field.
     
     This endpoint returns the description of the specified field.
     """
-    try:
-        _validate_user_id(request)
-        
-        field_descriptions = load_field_descriptions()
-        description = field_descriptions.get(field_name, "No description available.")
+    _, description_bytes = _get_field_payloads()
+    body = description_bytes.get(field_name)
+    
+    if body is None:
+        raise NotFoundError(f"Field '{field_name}' not found")
         
-        if description == "No description available.":
-            raise NotFoundError(f"Field '{field_name}' not found")
-            
-        return {"field_name": field_name, "description": description}
-    except Exception as e:
-        _handle_error(e, "get field description")
+    return Response(content=body, media_type="application/json")
 
-@router.get("/field-metadata", response_model=Dict[str, Any])
-async def get_field_metadata(
-    request: Request,
-    supabase: Client = Depends(get_supabase_client)
-):
+@router.get("/field-metadata", response_class=Response)
+async def get_field_metadata():
     """
     Get metadata for all available fields in a single call.
     
@@ -182,22 +197,14 @@ async def get_field_metadata(
             - fields: List of available field names
             - descriptions: Dictionary mapping field names to descriptions
     """
-    try:
-        _validate_user_id(request)
-        
-        field_descriptions = load_field_descriptions()
-        
-        return {
-            "fields": list(field_descriptions.keys()),
-            "descriptions": field_descriptions
-        }
-    except Exception as e:
-        _handle_error(e, "get field metadata")
+    metadata_bytes, _ = _get_field_payloads()
+    
+    return Response(content=metadata_bytes, media_type="application/json")
 
 @router.post("/extract-keywords")
 async def extract_keywords(
     request: Dict[str, Any]
-) -> Dict[str, List[str]]:
+) -> ORJSONResponse:
     """
     Extract keywords from agent name and description.
     
@@ -212,45 +219,82 @@ async def extract_keywords(
         Dictionary containing:
             - keywords: List of extracted keywords
     """
-    try:
-        agent_name = request.get("agent_name", "")
-        description = request.get("description", "")
-        model_name = request.get("model_name", "custom-vlm")
-        temperature = float(request.get("temperature", 0))
-        
-        if not agent_name or not description:
-            raise BadRequestError(
-                detail="Both agent_name and description are required",
-                additional_info={
-                    "missing_fields": [
-                        field for field in ["agent_name", "description"] 
-                        if not request.get(field)
-                    ]
-                }
-            )
-            
-        keywords = await extract_keywords_from_agent(
-            agent_name=agent_name,
-            description=description,
-            model_name=model_name,
-            temperature=temperature
+    agent_name = request.get("agent_name", "")
+    description = request.get("description", "")
+    model_name = request.get("model_name", "custom-vlm")
+    temperature = float(request.get("temperature", 0))
+    
+    if not agent_name or not description:
+        raise BadRequestError(
+            detail="Both agent_name and description are required",
+            additional_info={
+                "missing_fields": [
+                    field for field in ["agent_name", "description"] 
+                    if not request.get(field)
+                ]
+            }
         )
         
-        return {"keywords": keywords}
-        
-    except Exception as e:
-        _handle_error(e, "extract keywords from agent")
+    keywords = await extract_keywords_from_agent(
+        agent_name=agent_name,
+        description=description,
+        model_name=model_name,
+        temperature=temperature
+    )
+    
+    return ORJSONResponse(content={"keywords": keywords})
+
+@router.post("/parse-with-keywords")
+async def parse_with_keywords(
+    parse_request: BaseParserRequest
+) -> ORJSONResponse:
+    """
+    Parse user input to extract field information and keywords in one LLM call.
+    
+    Returns:
+        Dictionary containing:
+            - fields: Dictionary of extracted field values
+            - keywords: List of extracted keywords
+    """
+    fields, keywords = await extract_fields_and_keywords(
+        user_input=parse_request.user_input,
+        model_name=parse_request.model_name,
+        temperature=parse_request.temperature
+    )
+    
+    return ORJSONResponse(content={"fields": fields, "keywords": keywords})
+
+@router.post("/parse-and-recommend")
+async def parse_and_recommend_tools(
+    parse_request: BaseParserRequest
+) -> ORJSONResponse:
+    """
+    Parse user input, extract keywords and recommend MCP tools in one request.
+    
+    Keyword extraction and the tool search run concurrently once the fields are parsed.
+    
+    Returns:
+        Dictionary containing:
+            - fields: Dictionary of extracted field values
+            - keywords: List of extracted keywords
+            - recommended_tools: List of recommended MCP tools
+    """
+    result = await parse_and_recommend(
+        user_input=parse_request.user_input,
+        model_name=parse_request.model_name,
+        temperature=parse_request.temperature
+    )
+    
+    return ORJSONResponse(content=result)
 
 class MultiAgentParseRequest(BaseParserRequest):
     """Request for parsing multi-agent input."""
     existing_data: Optional[Dict[str, Any]] = Field(None, description="Existing data for the agents")
 
-@router.post("/parse-multi-agent", response_model=Dict[str, Any])
+@router.post("/parse-multi-agent")
 async def parse_multi_agent(
-    request: Request,
-    parse_request: MultiAgentParseRequest,
-    supabase: Client = Depends(get_supabase_client)
-):
+    parse_request: MultiAgentParseRequest
+) -> ORJSONResponse:
     """
     Parse user input to detect multiple agents and their differences.
     
@@ -261,23 +305,17 @@ async def parse_multi_agent(
     - Specific variations for each agent
     - Whether more information is needed
     """
-    try:
-        _validate_user_id(request)
-        
-        result = await parse_multi_agent_input(
-            user_input=parse_request.user_input,
-            model_name=parse_request.model_name,
-            temperature=parse_request.temperature
-        )
-        
-        # If we have existing data and this is multi-agent, merge the common attributes
-        if parse_request.existing_data and result.get("has_multi_agent"):
-            # Merge existing data into common attributes
-            for key, value in parse_request.existing_data.items():
-                if key not in result["common_attributes"] or not result["common_attributes"][key]:
-                    result["common_attributes"][key] = value
-        
-        return result
-        
-    except Exception as e:
-        _handle_error(e, "parse multi-agent input") 
\ No newline at end of file
+    result = await parse_multi_agent_input(
+        user_input=parse_request.user_input,
+        model_name=parse_request.model_name,
+        temperature=parse_request.temperature
+    )
+    
+    # If we have existing data and this is multi-agent, merge the common attributes
+    if parse_request.existing_data and result.get("has_multi_agent"):
+        # Merge existing data into common attributes
+        for key, value in parse_request.existing_data.items():
+            if key not in result["common_attributes"] or not result["common_attributes"][key]:
+                result["common_attributes"][key] = value
+    
+    return ORJSONResponse(content=result)
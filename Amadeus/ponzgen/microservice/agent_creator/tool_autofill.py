@@ -11,20 +11,44 @@ import json
 import os
 import sys
 import re
+import hashlib
+import orjson
 from datetime import datetime
 import asyncio
+import logging
 
 # Third-party imports
+from cachetools import TTLCache
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage
 
 # Local imports
 from .utils.mcphub_compass import get_recommended_tools
+from .utils.error_sampler import ErrorSampler
 from ..agent_boilerplate.boilerplate.errors import (
     BadRequestError, InternalServerError, ServiceUnavailableError
 )
 
-from ..agent_boilerplate.boilerplate.utils.get_llms import get_llms
+from ..agent_boilerplate.boilerplate.utils.get_llms import get_cached_llms
+
+logger = logging.getLogger(__name__)
+
+# Fields the user writes themselves; autofill returns their existing value
+_SKIP_FIELDS = frozenset({"agent_name", "description", "agent_style"})
+
+# Fields whose autofill only reads data (LLM / MCPHUB lookups) and can be cached
+_CACHEABLE_FIELDS = frozenset({"tools", "mcphub_recommended_tools"})
+
+# Quoted strings in an LLM response, used when it isn't a clean JSON array
+_TOOL_NAME_RE = re.compile(r'"([^"]+)"')
+
+_error_sampler = ErrorSampler()
+
+# Autofill results keyed by a hash of their inputs
+_autofill_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+
+# LLM tool recommendations keyed by a hash of the agent and tool set
+_recommendation_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
 
 class ToolAutofill:
     """
@@ -49,9 +73,34 @@ class ToolAutofill:
         {"name": "Google Calendar", "description": "Allows scheduling and managing calendar events and appointments.", "url": "https://calendar.google.com"}
     ]
     
-    def __init__(self):
-        """Initialize the AgentFieldAutofill."""
-        pass
+    # Serialized once, since the defaults never change
+    _DEFAULT_MCPHUB_TOOLS_JSON = orjson.dumps(DEFAULT_MCPHUB_TOOLS).decode()
+    
+    def __init__(self, select_all_threshold: Optional[int] = None):
+        """
+        Initialize the AgentFieldAutofill.
+        
+        Args:
+            select_all_threshold: Tool inventories of this size or smaller are
+                selected whole instead of asking the LLM (defaults to the
+                TOOL_AUTOFILL_SELECT_ALL_THRESHOLD env var, or 3)
+        """
+        if select_all_threshold is None:
+            select_all_threshold = int(os.getenv("TOOL_AUTOFILL_SELECT_ALL_THRESHOLD", "3"))
+        self.select_all_threshold = select_all_threshold
+        
+        # Handlers for fields with custom autofill logic, called as
+        # handler(json_field, available_tools, return_tool_ids)
+        self._field_handlers = {
+            # Tools field (LLM recommendation from the available tools)
+            "tools": lambda json_field, available_tools, return_tool_ids: (
+                self._handle_tools_field(available_tools, return_tool_ids, json_field)
+            ),
+            # MCPHUB tool recommendations (uses external API)
+            "mcphub_recommended_tools": lambda json_field, available_tools, return_tool_ids: (
+                self._handle_mcphub_recommended_tools(json_field)
+            ),
+        }
     
     def _validate_input(self, field_name: str, json_field: Dict[str, Any]) -> None:
         """
@@ -73,6 +122,43 @@ class ToolAutofill:
         if not isinstance(json_field, dict):
             raise BadRequestError("json_field must be a valid JSON object")
     
+    @staticmethod
+    def _autofill_cache_key(
+        field_name: str,
+        json_field: Dict[str, Any],
+        existing_field_value: str,
+        return_tool_ids: bool,
+        available_tools: List[Any],
+        model_name: str
+    ) -> str:
+        """
+        Build a content-addressed cache key for an autofill request.
+        
+        Args:
+            field_name: The name of the field to generate
+            json_field: JSON object containing other field values
+            existing_field_value: Existing value of the field
+            return_tool_ids: Whether tool IDs or names are returned
+            available_tools: List of available tools
+            model_name: The name of the LLM to use
+            
+        Returns:
+            Hex digest identifying the request inputs
+        """
+        payload = json.dumps(
+            [
+                field_name,
+                json_field,
+                existing_field_value,
+                return_tool_ids,
+                sorted(str(tool.tool_id) for tool in available_tools),
+                model_name
+            ],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    
     async def _get_recommended_tools(
         self,
         agent_name: str,
@@ -97,6 +183,21 @@ class ToolAutofill:
             List of recommended tool IDs
         """
         try:
+            cache_key = hashlib.blake2b(
+                orjson.dumps([
+                    agent_name,
+                    description,
+                    sorted(map(str, keywords)),
+                    sorted(str(tool.tool_id) for tool in available_tools),
+                    model_name,
+                    temperature
+                ]),
+                digest_size=16
+            ).hexdigest()
+            cached = _recommendation_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+            
             # Format tools for LLM prompt
             tool_descriptions = []
             tool_id_map = {}  # Map tool names to IDs for lookup
@@ -127,38 +228,34 @@ Example response format:
 ["Tool Name 1", "Tool Name 2"]"""
 
             # Get LLM instance
-            llm = get_llms(model_name=model_name, temperature=temperature)
+            llm = get_cached_llms(model_name=model_name, temperature=temperature)
             
             # Generate response
             response = await llm.ainvoke([HumanMessage(content=prompt)])
             
             # Extract tool names from response
             try:
-                tool_names = json.loads(response.content)
+                tool_names = orjson.loads(response.content)
                 if not isinstance(tool_names, list):
                     raise ValueError("Response is not a list")
-                    
-                # Convert tool names to IDs
-                tool_ids = []
-                for name in tool_names:
-                    tool_id = tool_id_map.get(name.lower())
-                    if tool_id:
-                        tool_ids.append(tool_id)
-                
-                return tool_ids
             except (json.JSONDecodeError, ValueError):
                 # If parsing fails, try to extract array using regex
-                import re
-                matches = re.findall(r'"([^"]+)"', response.content)
-                tool_ids = []
-                for name in matches:
-                    tool_id = tool_id_map.get(name.lower())
-                    if tool_id:
-                        tool_ids.append(tool_id)
-                return tool_ids
+                tool_names = _TOOL_NAME_RE.findall(response.content)
+            
+            # Convert tool names to IDs
+            tool_ids = []
+            for name in tool_names:
+                tool_id = tool_id_map.get(str(name).lower())
+                if tool_id:
+                    tool_ids.append(tool_id)
+            
+            if tool_ids:
+                _recommendation_cache[cache_key] = tuple(tool_ids)
+            return tool_ids
                 
         except Exception as e:
-            print(f"Error getting tool recommendations: {str(e)}")
+            if _error_sampler.should_emit(f"recommend:{type(e).__name__}"):
+                logger.exception("Error getting tool recommendations")
             return []
 
     async def _handle_tools_field(self, available_tools: List[Any], return_tool_ids: bool, json_field: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -190,6 +287,17 @@ Example response format:
             description = json_field.get("description", "")
             keywords = json_field.get("keywords", [])
             
+            # Small inventories are selected whole, no LLM round trip needed
+            if len(available_tools) <= self.select_all_threshold:
+                return {
+                    "field_name": "tools",
+                    "autofilled_value": [
+                        tool.tool_id if return_tool_ids else tool.name
+                        for tool in available_tools
+                    ],
+                    "reasoning": "Small tool inventory, selected all available tools."
+                }
+            
             # Get recommended tools
             recommended_tools = await self._get_recommended_tools(
                 agent_name=agent_name,
@@ -207,12 +315,8 @@ Example response format:
                     }
                 else:
                     # Convert IDs to names if needed
-                    tool_names = []
-                    for tool_id in recommended_tools:
-                        for tool in available_tools:
-                            if tool.tool_id == tool_id:
-                                tool_names.append(tool.name)
-                                break
+                    name_by_id = {tool.tool_id: tool.name for tool in available_tools}
+                    tool_names = [name_by_id[tool_id] for tool_id in recommended_tools if tool_id in name_by_id]
                     return {
                         "field_name": "tools",
                         "autofilled_value": tool_names,
@@ -252,18 +356,19 @@ Example response format:
             
         try:
             # Call the MCPHUB Compass API to get tool recommendations using only keywords
+            # (get_recommended_tools caches results per keyword set)
             tools_data = await get_recommended_tools(keywords=keywords)
             
             return {
                 "field_name": "mcphub_recommended_tools",
-                "autofilled_value": json.dumps(tools_data),
+                "autofilled_value": orjson.dumps(tools_data).decode(),
                 "reasoning": "Generated MCPHUB tool recommendations based on agent keywords."
             }
         except Exception as e:
             # Fall back to default tools if API call fails
             return {
                 "field_name": "mcphub_recommended_tools",
-                "autofilled_value": json.dumps(self.DEFAULT_MCPHUB_TOOLS),
+                "autofilled_value": self._DEFAULT_MCPHUB_TOOLS_JSON,
                 "reasoning": f"Error fetching MCPHUB recommendations, using defaults. Error: {str(e)}"
             }
     
@@ -301,33 +406,45 @@ Example response format:
         Returns:
             Dictionary containing the autofilled value
         """
-        try:
-            # Step 1: Validate inputs
-            self._validate_input(field_name, json_field)
-            
-            # Skip autofill for agent_name, description, and agent_style
-            if field_name in ["agent_name", "description", "agent_style"]:
-                return {
-                    "field_name": field_name,
-                    "autofilled_value": existing_field_value,
-                    "reasoning": "Autofill skipped for this field."
-                }
-            
-            # Step 2: Handle special fields with specific logic
-            # Special case: Tools field (returns all available tools)
-            if field_name == "tools":
-                return await self._handle_tools_field(available_tools, return_tool_ids, json_field)
-            
-            # Special case: MCPHUB tool recommendations (uses external API)
-            if field_name == "mcphub_recommended_tools":
-                return await self._handle_mcphub_recommended_tools(json_field)
-            
-            # Return empty for any other fields
+        # Step 1: Validate inputs
+        self._validate_input(field_name, json_field)
+        
+        # Skip autofill for agent_name, description, and agent_style
+        if field_name in _SKIP_FIELDS:
+            return {
+                "field_name": field_name,
+                "autofilled_value": existing_field_value,
+                "reasoning": "Autofill skipped for this field."
+            }
+        
+        # Return empty for fields without custom logic
+        handler = self._field_handlers.get(field_name)
+        if handler is None:
             return {
                 "field_name": field_name,
                 "autofilled_value": "",
                 "reasoning": "Field not supported for autofill."
             }
+        
+        try:
+            # Only deterministic (temperature 0) lookups are served from the cache
+            cache_key = None
+            if field_name in _CACHEABLE_FIELDS and temperature == 0:
+                cache_key = self._autofill_cache_key(
+                    field_name, json_field, existing_field_value,
+                    return_tool_ids, available_tools, model_name
+                )
+                cached = _autofill_cache.get(cache_key)
+                if cached is not None:
+                    return dict(cached)
+            
+            # Step 2: Handle special fields with specific logic
+            result = await handler(json_field, available_tools, return_tool_ids)
+            
+            # Don't cache empty results or error fallbacks
+            if cache_key and result.get("autofilled_value") and not str(result.get("reasoning", "")).startswith("Error"):
+                _autofill_cache[cache_key] = dict(result)
+            return result
             
         except (BadRequestError, ServiceUnavailableError):
             # Re-raise known errors
@@ -342,6 +459,52 @@ Example response format:
                 }
             )
     
+    async def generate_autofills_batch(
+        self,
+        field_names: List[str],
+        json_field: Dict[str, Any],
+        available_tools: List[Any],
+        existing_field_values: Optional[Dict[str, str]] = None,
+        return_tool_ids: bool = True,
+        model_name: str = "custom-vlm",
+        temperature: float = 0
+    ) -> List[Any]:
+        """
+        Generate autofills for several fields concurrently.
+        
+        The fields are independent (LLM and MCPHUB lookups), so they run in
+        parallel and the total latency is that of the slowest field.
+        
+        Args:
+            field_names: The names of the fields to generate
+            json_field: JSON object containing other field values
+            available_tools: List of available tools that can be recommended
+            existing_field_values: Existing values of the fields, keyed by field name
+            return_tool_ids: Whether to return tool IDs instead of names for tools field
+            model_name: The name of the LLM to use
+            temperature: The temperature setting for the model (0-1)
+            
+        Returns:
+            List with one autofill dictionary per field, in the order of field_names,
+            or the exception raised while generating that field
+        """
+        existing_field_values = existing_field_values or {}
+        return await asyncio.gather(
+            *(
+                self.generate_autofill(
+                    field_name=field_name,
+                    json_field=json_field,
+                    available_tools=available_tools,
+                    existing_field_value=existing_field_values.get(field_name, ""),
+                    return_tool_ids=return_tool_ids,
+                    model_name=model_name,
+                    temperature=temperature
+                )
+                for field_name in field_names
+            ),
+            return_exceptions=True
+        )
+    
     async def generate_autofill_stream(
         # currently not used
         self, 
@@ -354,16 +517,16 @@ Example response format:
         temperature: float = 0
     ) -> AsyncGenerator[str, None]:
         """Stream the generation of field autofill."""
+        # Step 1: Validate inputs
+        self._validate_input(field_name, json_field)
+        
+        # Skip autofill for agent_name, description, and agent_style
+        if field_name in _SKIP_FIELDS:
+            yield f"data: {orjson.dumps(existing_field_value).decode()}\n\n"
+            yield "data: [DONE]\n\n"
+            return
+        
         try:
-            # Step 1: Validate inputs
-            self._validate_input(field_name, json_field)
-            
-            # Skip autofill for agent_name, description, and agent_style
-            if field_name in ["agent_name", "description", "agent_style"]:
-                yield f"data: {json.dumps(existing_field_value)}\n\n"
-                yield "data: [DONE]\n\n"
-                return
-            
             # Step 2: Handle special fields with specific streaming logic
             # Special case: MCPHUB tool recommendations (uses external API)
             if field_name == "mcphub_recommended_tools":
@@ -378,7 +541,7 @@ Example response format:
                 return
             
             # For any other fields, return empty
-            yield f"data: {json.dumps('')}\n\n"
+            yield 'data: ""\n\n'
             yield "data: [DONE]\n\n"
                 
         except (BadRequestError, ServiceUnavailableError, InternalServerError):
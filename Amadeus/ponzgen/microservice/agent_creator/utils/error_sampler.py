@@ -0,0 +1,37 @@
+"""
+Error Sampler
+
+This module provides a sampler that rate-limits error logging, so a burst of
+identical failures (e.g. a database outage) produces one log record per
+interval instead of one per request.
+"""
+
+from cachetools import TTLCache
+
+class ErrorSampler:
+    """Allows one log record per error key within each interval."""
+    
+    def __init__(self, interval: float = 60, maxsize: int = 256):
+        """
+        Initialize the sampler.
+        
+        Args:
+            interval: Seconds during which repeats of a key are suppressed
+            maxsize: Maximum number of distinct keys tracked at once
+        """
+        self._recent = TTLCache(maxsize=maxsize, ttl=interval)
+    
+    def should_emit(self, key: str) -> bool:
+        """
+        Check whether an error with this key should be logged now.
+        
+        Args:
+            key: Identifies the kind of error (e.g. "fetch:TimeoutError")
+            
+        Returns:
+            True for the first occurrence of the key in the current interval
+        """
+        if key in self._recent:
+            return False
+        self._recent[key] = True
+        return True
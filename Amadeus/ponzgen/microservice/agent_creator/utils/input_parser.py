@@ -6,12 +6,18 @@ It uses LLM to analyze natural language input and extract structured field data
 based on the field descriptions.
 """
 
+import asyncio
 import json
 import re
+from functools import lru_cache
 
-from typing import Dict, Any, List, Optional, Union, AsyncGenerator
+# Used for all parse attempts; orjson.JSONDecodeError subclasses json.JSONDecodeError
+import orjson
+
+from typing import Dict, Any, List, Optional, Union, AsyncGenerator, Pattern, Tuple
 
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_openai import ChatOpenAI
 import logging
 
 # Configure logger
@@ -22,10 +28,51 @@ from microservice.agent_field_autofill.utils.field_utils import load_field_descr
 from others.prompts.input_parser_prompts import (
     create_extraction_prompt,
     create_keyword_extraction_prompt,
+    create_fields_and_keywords_prompt,
     create_multi_agent_parsing_prompt
 )
 
-from microservice.agent_boilerplate.boilerplate.utils.get_llms import get_llms
+from microservice.agent_boilerplate.boilerplate.utils.get_llms import get_cached_llms
+from .llm_cache import llm_cache, semantic_cache
+from .mcphub_compass import make_compass_request, _format_server_for_frontend
+from .llm_batch import llm_batch_queue
+
+# Single-character substitutions applied before parsing LLM JSON output:
+# smart double/single quotes become straight double quotes, NBSP becomes a space
+_SMART_QUOTE_TABLE = str.maketrans({
+    "\u201c": '"', "\u201d": '"',
+    "\u2018": '"', "\u2019": '"',
+    "\xa0": " "
+})
+
+# Shared system message for every JSON-producing call; keeping it byte-identical
+# lets the inference server reuse its cached prompt prefix across endpoints
+_SYSTEM_JSON = SystemMessage(content="You are a strict JSON generator. Output only valid JSON. Do not add any conversational text or markdown.")
+
+# System message for the line-delimited field stream, where the output is one JSON
+# object per line rather than a single JSON document
+_SYSTEM_JSON_LINES = SystemMessage(content="You are a strict JSON generator. Output only JSON lines, one valid JSON object per line. Do not add any conversational text or markdown.")
+
+# Minimum growth (in characters) of the streamed buffer between two parse attempts
+_STREAM_PARSE_MIN_GROWTH = 256
+
+# Characters that can complete a JSON value; only chunks containing one trigger a parse
+_STREAM_PARSE_TRIGGERS = ('}', '"', ',')
+
+# Responses longer than this (in characters) are parsed in a worker thread so the
+# regex-heavy cleanup doesn't block the event loop
+_PARSE_OFFLOAD_THRESHOLD = 4096
+
+# Precompiled patterns used when cleaning up and extracting JSON from LLM output
+_RE_SINGLE_KEY = re.compile(r"'([\w@\s]+)':")
+_RE_SINGLE_VAL = re.compile(r":\s*'([^']*)'(?=\s*[,}\]])")
+_RE_UNQUOTED_KEY = re.compile(r"([{,]\s*)([\w@]+):")
+_RE_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+_RE_TRAIL_PUNCT = re.compile(r'[:,\s]+$')
+_RE_JSON_STRUCTURE = re.compile(r'\\.|["{}\[\]]', re.DOTALL)
+_RE_CODEBLOCK = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+_RE_OUTER_OBJ = re.compile(r'(\{.*\})', re.DOTALL)
+_RE_CODEBLOCK_LIST = re.compile(r'```(?:json)?\s*(\[.*?\])\s*```', re.DOTALL)
 
 class InputParser:
     """
@@ -33,9 +80,20 @@ class InputParser:
     Uses LLM to analyze natural language input and derive field values.
     """
     
+    # Placeholder used to split the extraction prompt around the user input
+    _USER_INPUT_MARKER = "\x00__USER_INPUT__\x00"
+    
     def __init__(self):
         """Initialize the InputParser with field descriptions."""
         self.field_descriptions = load_field_descriptions()
+        self._field_names = frozenset(self.field_descriptions)
+        
+        # The extraction prompt only varies by user input, so build the
+        # static text around it once
+        template = create_extraction_prompt(self._USER_INPUT_MARKER, self.field_descriptions)
+        self._extraction_prompt_prefix, self._extraction_prompt_suffix = template.split(self._USER_INPUT_MARKER)
+        template = create_extraction_prompt(self._USER_INPUT_MARKER, self.field_descriptions, line_delimited=True)
+        self._stream_prompt_prefix, self._stream_prompt_suffix = template.split(self._USER_INPUT_MARKER)
     
     def _validate_input(self, user_input: str) -> None:
         """
@@ -60,7 +118,7 @@ class InputParser:
         Raises:
             ValueError: If any field name is invalid
         """
-        invalid_fields = [field for field in target_fields if field not in self.field_descriptions]
+        invalid_fields = [field for field in target_fields if field not in self._field_names]
         if invalid_fields:
             raise ValueError(f"Invalid field names: {', '.join(invalid_fields)}")
     
@@ -74,25 +132,64 @@ class InputParser:
         Returns:
             Prompt string for the LLM
         """
-        return create_extraction_prompt(user_input, self.field_descriptions)
+        return self._extraction_prompt_prefix + user_input + self._extraction_prompt_suffix
+    
+    def _create_stream_extraction_prompt(self, user_input: str) -> str:
+        """
+        Create a prompt asking for one JSON object per field, one per line.
+        
+        Args:
+            user_input: The natural language input from the user
+            
+        Returns:
+            Prompt string for the LLM
+        """
+        return self._stream_prompt_prefix + user_input + self._stream_prompt_suffix
+    
+    @staticmethod
+    def _parse_field_line(line: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse one line of a line-delimited field stream.
+        
+        Args:
+            line: A single line of LLM output
+            
+        Returns:
+            {field: value} for a {"field": "<name>", "value": <value>} record, or None
+            for any other line (including other JSON objects, such as the lines of a
+            pretty-printed single-object answer)
+        """
+        line = line.strip().rstrip(',')
+        if not line.startswith('{'):
+            return None
+        try:
+            record = orjson.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(record, dict) or "value" not in record:
+            return None
+        field = record.get("field")
+        if not isinstance(field, str):
+            return None
+        return {field: record["value"]}
     
     @staticmethod
-    def _parse_json_structure(response_content: str, pattern: str, is_list: bool = False) -> Union[Dict[str, Any], List[str]]:
+    def _parse_json_structure(response_content: str, pattern: Pattern[str], is_list: bool = False) -> Union[Dict[str, Any], List[str]]:
         """
         Helper method to parse JSON from a text using a regex pattern.
         
         Args:
             response_content: The text content to parse
-            pattern: Regex pattern to extract JSON
+            pattern: Compiled regex pattern whose first group captures the JSON
             is_list: Whether to parse as a list or dictionary
             
         Returns:
             Parsed JSON as dictionary/list or empty dict/list if parsing fails
         """
-        json_match = re.search(pattern, response_content, re.DOTALL)
+        json_match = pattern.search(response_content)
         if json_match:
             try:
-                result = json.loads(json_match.group(1))
+                result = orjson.loads(json_match.group(1))
                 if (is_list and isinstance(result, list)) or (not is_list and isinstance(result, dict)):
                     return result
             except json.JSONDecodeError:
@@ -105,40 +202,33 @@ class InputParser:
         """
         Sanitize JSON string by replacing smart quotes and other common issues.
         """
-        # Replace smart double quotes with standard double quote
-        content = content.replace('“', '"').replace('”', '"')
-        
-        # Replace smart single and double quotes
-        content = content.replace("‘", '"').replace("’", '"')
-        content = content.replace("“", '"').replace("”", '"')
-        
-        # Replace common JSON-breaking characters
-        content = content.replace('\xa0', ' ') # Non-breaking space
+        # Replace smart quotes and non-breaking spaces in a single pass
+        content = content.translate(_SMART_QUOTE_TABLE)
 
         # Remove markdown escaping for underscores (e.g., agent\_count -> agent_count)
         content = content.replace(r'\_', '_')
         
         # Handle cases where the LLM outputs Python-style dicts with single quotes
-        # 1. Replace single-quoted keys: 'key': -> "key":
-        content = re.sub(r"'([\w@\s]+)':", r'"\1":', content)
-        
-        # 2. Replace single-quoted string values: : 'value' -> : "value"
-        # Be careful not to replace apostrophes inside words (like user's)
-        # We look for: : \s* ' (content) ' 
-        # But parsing arbitrary strings with regex is hard, so we do a simpler heuristic for common simple values
-        # We look for : '...' but avoiding internal quotes if possible, or just blind replace if simple
+        # (skipped entirely when the buffer has no single quotes)
+        if "'" in content:
+            # 1. Replace single-quoted keys: 'key': -> "key":
+            content = _RE_SINGLE_KEY.sub(r'"\1":', content)
         
-        # A more robust approach for values: Look for : '...' followed by comma or brace
-        content = re.sub(r":\s*'([^']*)'(?=\s*[,}\]])", r': "\1"', content)
+            # 2. Replace single-quoted string values: : 'value' -> : "value"
+            # Be careful not to replace apostrophes inside words (like user's)
+            # We look for: : \s* ' (content) ' 
+            # But parsing arbitrary strings with regex is hard, so we do a simpler heuristic for common simple values
+            # We look for : '...' but avoiding internal quotes if possible, or just blind replace if simple
         
-        # 3. Also handle empty single quoted strings: : '' -> : ""
-        content = content.replace(": ''", ': ""')
+            # A more robust approach for values: Look for : '...' followed by comma or brace
+            # (this also covers empty values: : '' -> : "")
+            content = _RE_SINGLE_VAL.sub(r': "\1"', content)
 
-        # 4. Unquoted keys: { key: -> { "key": 
-        content = re.sub(r"([{,]\s*)([\w@]+):", r'\1"\2":', content)
+        # 3. Unquoted keys: { key: -> { "key": 
+        content = _RE_UNQUOTED_KEY.sub(r'\1"\2":', content)
         
         # Remove trailing commas (e.g. "key": "val", } -> "key": "val" })
-        content = re.sub(r',\s*([}\]])', r'\1', content)
+        content = _RE_TRAILING_COMMA.sub(r'\1', content)
         
         return content
 
@@ -153,56 +243,61 @@ class InputParser:
         Returns:
             Parsed JSON as dictionary or empty dict if parsing fails
         """
-        # Sanitize content first
+        # Without an opening brace no parse attempt can produce an object
+        if '{' not in response_content:
+            return {}
+        
+        # Well-formed output parses as-is, so skip the sanitizer passes for it
+        try:
+            result = orjson.loads(response_content)
+            if isinstance(result, dict):
+                return result
+        except json.JSONDecodeError:
+            pass
+        
+        # Sanitize content before the fallbacks
         response_content = InputParser._sanitize_json_string(response_content)
 
         # Try direct JSON parsing
         try:
-            return json.loads(response_content)
+            return orjson.loads(response_content)
         except json.JSONDecodeError:
             # Try to repair truncated JSON
             repaired = InputParser._repair_truncated_json(response_content)
             try:
                 if repaired != response_content:
-                    return json.loads(repaired)
+                    return orjson.loads(repaired)
             except json.JSONDecodeError:
                 pass
             
         # Try extracting JSON from code block
-        result = InputParser._parse_json_structure(response_content, r'```(?:json)?\s*(.*?)\s*```')
+        result = InputParser._parse_json_structure(response_content, _RE_CODEBLOCK)
         if result:
             return result
             
         # Try extracting any JSON-like structure
-        result = InputParser._parse_json_structure(response_content, r'(\{.*\})')
+        result = InputParser._parse_json_structure(response_content, _RE_OUTER_OBJ)
         if result:
             return result
         
-        # Try finding the largest outer bracket pair as a fallback
+        # Try finding the first balanced object as a fallback
         try:
-            # Look for everything between the first '{' and the last '}'
-            start_idx = response_content.find('{')
-            end_idx = response_content.rfind('}')
-            
-            if start_idx != -1:
-                # If we have a closing brace, use that range
-                if end_idx != -1 and end_idx > start_idx:
-                    json_str = response_content[start_idx:end_idx+1]
-                else:
-                    # If no closing brace, take everything from the start and try to repair it
-                    json_str = response_content[start_idx:]
-                
+            # Take the first complete top-level object, or everything from the
+            # first '{' when it never closes so the repair below can finish it
+            json_str = InputParser._find_first_json_block(response_content, '{')
+            
+            if json_str is not None:
                 # A final attempt to fix single quotes in the extracted block
                 if '"' not in json_str or (json_str.find("'") < json_str.find('"') and "'" in json_str):
                     json_str = json_str.replace("'", '"')
                     
                 try:
-                    return json.loads(json_str)
+                    return orjson.loads(json_str)
                 except json.JSONDecodeError:
                     # Final attempt: repair the extracted block if it's truncated
                     repaired_block = InputParser._repair_truncated_json(json_str)
                     try:
-                        return json.loads(repaired_block)
+                        return orjson.loads(repaired_block)
                     except json.JSONDecodeError:
                         pass
         except (json.JSONDecodeError, ValueError):
@@ -211,6 +306,42 @@ class InputParser:
         # Return empty dict if all extraction attempts failed
         return {}
 
+    @staticmethod
+    def _find_first_json_block(content: str, opener: str) -> Optional[str]:
+        """
+        Find the first top-level JSON object or array in a text in one pass.
+        
+        Brackets inside string values and escaped characters are ignored.
+        
+        Args:
+            content: The text to search
+            opener: '{' to find an object or '[' to find an array
+            
+        Returns:
+            The first complete block, everything from the opener if it never
+            closes, or None if the opener doesn't occur
+        """
+        start_idx = content.find(opener)
+        if start_idx == -1:
+            return None
+        
+        depth = 0
+        in_string = False
+        for match in _RE_JSON_STRUCTURE.finditer(content, start_idx):
+            token = match.group()
+            if token == '"':
+                in_string = not in_string
+            elif in_string or len(token) > 1:
+                continue
+            elif token in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return content[start_idx:match.end()]
+        
+        return content[start_idx:]
+    
     @staticmethod
     def _repair_truncated_json(json_str: str) -> str:
         """Attempt to repair truncated JSON by closing open braces and brackets."""
@@ -218,20 +349,38 @@ class InputParser:
         if not json_str:
             return ""
             
-        # Balance braces and brackets
-        braces = json_str.count('{') - json_str.count('}')
-        brackets = json_str.count('[') - json_str.count(']')
-        
         # Remove trailing colon or comma which might prevent parsing even after closing
-        json_str = re.sub(r'[:,\s]+$', '', json_str)
+        json_str = _RE_TRAIL_PUNCT.sub('', json_str)
+        
+        # Walk the structural characters once, tracking string state so brackets
+        # inside string values are ignored, and remember which closers are pending
+        closers = []
+        in_string = False
+        last_end = 0
+        for match in _RE_JSON_STRUCTURE.finditer(json_str):
+            token = match.group()
+            last_end = match.end()
+            if token == '"':
+                in_string = not in_string
+            elif in_string or len(token) > 1:
+                # Brackets inside strings and escaped characters don't affect structure
+                continue
+            elif token == '{':
+                closers.append('}')
+            elif token == '[':
+                closers.append(']')
+            elif closers:
+                closers.pop()
         
         # If inside a string value that isn't closed
-        if json_str.count('"') % 2 != 0:
+        if in_string:
+            # A dangling backslash would escape the closing quote
+            if json_str.endswith('\\') and last_end != len(json_str):
+                json_str = json_str[:-1]
             json_str += '"'
             
-        # Close open structures
-        json_str += ']' * max(0, brackets)
-        json_str += '}' * max(0, braces)
+        # Close open structures, innermost first
+        json_str += ''.join(reversed(closers))
         
         return json_str
     
@@ -246,23 +395,32 @@ class InputParser:
         Returns:
             Parsed list or empty list if parsing fails
         """
+        # Without an opening bracket no parse attempt can produce a list
+        if '[' not in response_content:
+            return []
+        
         # Try direct JSON parsing
         try:
-            result = json.loads(response_content)
+            result = orjson.loads(response_content)
             if isinstance(result, list):
                 return result
         except json.JSONDecodeError:
             pass
             
         # Try extracting list from code block
-        result = InputParser._parse_json_structure(response_content, r'```(?:json)?\s*(\[.*?\])\s*```', is_list=True)
+        result = InputParser._parse_json_structure(response_content, _RE_CODEBLOCK_LIST, is_list=True)
         if result:
             return result
             
-        # Try extracting any list-like structure
-        result = InputParser._parse_json_structure(response_content, r'(\[.*?\])', is_list=True)
-        if result:
-            return result
+        # Try extracting the first complete list
+        list_str = InputParser._find_first_json_block(response_content, '[')
+        if list_str is not None:
+            try:
+                result = orjson.loads(list_str)
+                if isinstance(result, list):
+                    return result
+            except json.JSONDecodeError:
+                pass
         
         # Return empty list if all extraction attempts failed
         return []
@@ -356,6 +514,95 @@ class InputParser:
 # Create a singleton instance
 input_parser = InputParser()
 
+@lru_cache(maxsize=32)
+def _get_json_mode_llm(model_name: str, temperature: float):
+    """
+    Get an LLM constrained to emit a JSON object, when the provider supports it.
+    
+    OpenAI-compatible chat models accept response_format={"type": "json_object"};
+    other models (e.g. the local custom VLM) are returned unchanged. The bound
+    runnable is cached so concurrent calls share one instance and can be batched.
+    
+    Returns:
+        Tuple of (LLM runnable, whether JSON mode is enabled)
+    """
+    llm = get_cached_llms(model_name, temperature)
+    if isinstance(llm, ChatOpenAI):
+        return llm.bind(response_format={"type": "json_object"}), True
+    return llm, False
+
+async def _invoke_llm(
+    namespace: str,
+    prompt: str,
+    model_name: str,
+    temperature: float,
+    json_mode: bool = False
+) -> str:
+    """
+    Invoke the LLM with the shared JSON system message and return the response text,
+    reusing identical temperature-0 calls through the shared LLM response cache.
+    
+    Args:
+        namespace: Cache namespace of the calling operation
+        prompt: The human message content
+        model_name: The name of the LLM to use
+        temperature: The temperature setting for the model (0-1)
+        json_mode: Whether to request a JSON object response where supported
+        
+    Returns:
+        The raw response content
+    """
+    cache_key = None
+    if round(temperature, 3) == 0:
+        cache_key = llm_cache.make_key(namespace, model_name, temperature, json_mode, _SYSTEM_JSON.content, prompt)
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    if json_mode:
+        llm, _ = _get_json_mode_llm(model_name, temperature)
+    else:
+        llm = get_cached_llms(model_name, temperature)
+    # Concurrent calls to the same model are coalesced into batches
+    response = await llm_batch_queue.submit(
+        llm, [_SYSTEM_JSON, HumanMessage(content=prompt)]
+    )
+    content = response.content if hasattr(response, 'content') else str(response)
+    
+    if cache_key is not None and content:
+        await llm_cache.set(cache_key, content)
+    return content
+
+async def _parse_json_async(content: str) -> Dict[str, Any]:
+    """
+    Parse JSON from an LLM response, offloading large responses to a worker thread.
+    
+    Args:
+        content: The LLM response content
+        
+    Returns:
+        Extracted JSON data as dictionary
+    """
+    if len(content) > _PARSE_OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(InputParser._parse_json_from_response, content)
+    return InputParser._parse_json_from_response(content)
+
+def _apply_field_defaults(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in default values for extracted fields the LLM left empty."""
+    if "description" in result and not result["description"]:
+        # Use agent_name for the default description if available
+        agent_name = result.get("agent_name", "This agent")
+        result["description"] = f"{agent_name} is designed to assist users with their tasks."
+    return result
+
+def _normalize_keywords(keywords: List[str]) -> List[str]:
+    """Pad or trim an extracted keyword list to 5-6 entries."""
+    if len(keywords) < 5:
+        keywords.extend(['automation', 'helper'][:5 - len(keywords)])
+    elif len(keywords) > 6:
+        keywords = keywords[:6]
+    return keywords
+
 async def extract_fields_from_input(
     user_input: str, 
     model_name: str = "custom-vlm", 
@@ -377,30 +624,60 @@ async def extract_fields_from_input(
     # Create the extraction prompt
     prompt = input_parser._create_extraction_prompt(user_input)
     
+    # Near-duplicate inputs can reuse a previous deterministic extraction
+    semantic_namespace = f"fields:{model_name}"
+    deterministic = round(temperature, 3) == 0
+    if deterministic:
+        cached = await semantic_cache.lookup(semantic_namespace, user_input)
+        if cached is not None:
+            return cached
+    
     # Get LLM and generate extraction
     try:
-        llm = get_llms(model_name, temperature)
-        
-        system_message = SystemMessage(content="You are a strict JSON generator. Output only valid JSON.")
-        response = await llm.ainvoke(
-            [system_message, HumanMessage(content=prompt)]
+        content = await _invoke_llm(
+            "fields",
+            prompt,
+            model_name,
+            temperature,
+            json_mode=True
         )
         
         # Parse the response
-        content = response.content if hasattr(response, 'content') else str(response)
-        result = InputParser._parse_json_from_response(content)
-        
-        # Apply default values for empty fields
-        if "description" in result and not result["description"]:
-            # Use agent_name for the default description if available
-            agent_name = result.get("agent_name", "This agent")
-            result["description"] = f"{agent_name} is designed to assist users with their tasks."
-            
-        return result
-            
-    except Exception as e:
-        print(f"Error extracting fields: {str(e)}")
+        result = _apply_field_defaults(await _parse_json_async(content))
+    except Exception:
+        logger.exception("Error extracting fields")
         return {}
+    
+    # Caching is best-effort and never replaces the extracted result
+    if deterministic and result:
+        await semantic_cache.add(semantic_namespace, user_input, result)
+    
+    return result
+
+
+async def extract_fields_from_inputs(
+    user_inputs: List[str],
+    model_name: str = "custom-vlm",
+    temperature: float = 0
+) -> List[Dict[str, Any]]:
+    """
+    Extract field information from several user inputs concurrently.
+    
+    Useful for filling in each detected agent of a multi-agent request, where
+    the per-agent extractions are independent of each other.
+    
+    Args:
+        user_inputs: The natural language inputs, one per agent
+        model_name: The name of the LLM to use
+        temperature: The temperature setting for the model (0-1)
+        
+    Returns:
+        List of dictionaries of extracted field values, in the same order as user_inputs
+    """
+    return list(await asyncio.gather(*(
+        extract_fields_from_input(user_input, model_name, temperature)
+        for user_input in user_inputs
+    )))
 
 
 async def extract_fields_from_input_stream(
@@ -419,63 +696,124 @@ async def extract_fields_from_input_stream(
     Yields:
         Dictionary updates with the extracted field values as they are generated
     """
-    # Create the extraction prompt 
-    prompt = input_parser._create_extraction_prompt(user_input)
+    # Create the line-delimited extraction prompt
+    prompt = input_parser._create_stream_extraction_prompt(user_input)
     
-    # Get LLM and generate extraction
+    # Get LLM and generate extraction (JSON mode would force a single object,
+    # so the stream uses the plain model)
     try:
-        llm = get_llms(model_name, temperature)
-        
-        system_message = SystemMessage(content="You are a strict JSON generator. Output only valid JSON.")
+        llm = get_cached_llms(model_name, temperature)
         
         # Start with empty content to accumulate tokens
         accumulated_content = ""
+        line_buffer = ""
+        line_delimited = False
         partial_result = {}
+        extracted_data = {}
+        last_parse_len = 0
+        object_started = False
+        
+        def _collect_updates(extracted_data: Dict[str, Any]) -> Dict[str, Any]:
+            """Record and return every field that changed since the last yield."""
+            field_update = {}
+            for field, field_value in extracted_data.items():
+                # Include a field if we have a value and it's different from what we last yielded
+                # We include even empty strings if the field was previously unknown
+                if field_value is not None and field_value != partial_result.get(field):
+                    partial_result[field] = field_value
+                    field_update[field] = field_value
+            return field_update
         
         # Use streaming response
         async for chunk in llm.astream(
-            [system_message, HumanMessage(content=prompt)]
+            [_SYSTEM_JSON_LINES, HumanMessage(content=prompt)]
         ):
             if not hasattr(chunk, 'content'):
                 continue
                 
             content_chunk = chunk.content
             accumulated_content += content_chunk
+            line_buffer += content_chunk
+            
+            # Each completed line is parsed exactly once
+            field_update = {}
+            while "\n" in line_buffer:
+                line, line_buffer = line_buffer.split("\n", 1)
+                record = InputParser._parse_field_line(line)
+                if record is not None:
+                    line_delimited = True
+                    field_update.update(_collect_updates(record))
+            
+            if field_update:
+                logger.debug("Yielding field update: %s", list(field_update))
+                yield field_update
+            if line_delimited:
+                continue
+            
+            # Fallback for models that answer with a single (possibly pretty-printed)
+            # JSON object: throttled re-parse of the whole buffer
+            
+            # Nothing can be parsed until the JSON object has started
+            if not object_started:
+                if '{' not in content_chunk:
+                    continue
+                object_started = True
+            
+            # Re-parsing the whole buffer is O(n), so only do it once enough new
+            # content arrived and the chunk may have closed a value
+            if (len(accumulated_content) - last_parse_len < _STREAM_PARSE_MIN_GROWTH
+                    or not any(c in content_chunk for c in _STREAM_PARSE_TRIGGERS)):
+                continue
+            last_parse_len = len(accumulated_content)
             
             # Try to parse the accumulated content
-            extracted_data = InputParser._parse_json_from_response(accumulated_content)
+            extracted_data = await _parse_json_async(accumulated_content)
             
-            # Log debug info occasionally
-            if len(accumulated_content) % 50 == 0:
-                print(f"DEBUG Stream: Content length {len(accumulated_content)}")
-                print(f"DEBUG Stream: Content peek: {accumulated_content[-100:]}")  # Log last 100 chars
+            # Log debug info (the tail slice is only built when debug logging is on)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Stream: content length %d, peek %s", len(accumulated_content), accumulated_content[-100:])
 
-            # Process all extracted fields
-            for field, field_value in extracted_data.items():
-                # Yield if we have a value and it's different from what we last yielded
-                # We yield even for empty strings if the field was previously unknown
-                if field_value is not None and field_value != partial_result.get(field):
-                    partial_result[field] = field_value
-                    # Yield an update for this field
-                    logger.info(f"Yielding field update: {field}")
-                    yield {field: field_value}
+            # Yield one update per chunk so the caller encodes it once
+            field_update = _collect_updates(extracted_data)
+            if field_update:
+                logger.debug("Yielding field update: %s", list(field_update))
+                yield field_update
+        
+        if line_delimited:
+            # The last line may not end with a newline
+            record = InputParser._parse_field_line(line_buffer)
+            field_update = _collect_updates(record) if record is not None else {}
+        elif len(accumulated_content) > last_parse_len:
+            # Parse whatever arrived after the last throttled parse
+            last_parse_len = len(accumulated_content)
+            extracted_data = await _parse_json_async(accumulated_content)
+            field_update = _collect_updates(extracted_data)
+        else:
+            field_update = {}
+        if field_update:
+            logger.debug("Yielding field update: %s", list(field_update))
+            yield field_update
         
         # Final safety yield - ensure we send everything we have at the end
         if partial_result:
-            logger.info(f"Final yield of {len(partial_result)} fields")
+            logger.info("Final yield of %d fields", len(partial_result))
             yield partial_result
         else:
-            # If we still have nothing, try one last aggressive parse of the full content
-            last_ditch_result = InputParser._parse_json_from_response(accumulated_content)
+            # Reuse the full-buffer parse when there was one; line-delimited
+            # streams get a single aggressive parse of everything
+            if line_delimited:
+                last_ditch_result = await _parse_json_async(accumulated_content)
+            else:
+                last_ditch_result = extracted_data
             if last_ditch_result:
-                logger.info(f"Last ditch extraction successful: {list(last_ditch_result.keys())}")
+                logger.info("Last ditch extraction successful: %s", list(last_ditch_result))
                 yield last_ditch_result
             else:
                 logger.warning("All extraction attempts failed for stream.")
                 yield {}
             
-    except Exception as e:
-        print(f"Error streaming field extraction: {str(e)}")
+    except Exception:
+        logger.exception("Error streaming field extraction")
         yield {}
 
 async def extract_keywords_from_agent(
@@ -498,29 +836,114 @@ async def extract_keywords_from_agent(
     """
     
     try:
-        llm = get_llms(model_name, temperature)
-        
         prompt = create_keyword_extraction_prompt(agent_name, description)
         
-        system_message = SystemMessage(content="You are a strict JSON generator. Output only valid JSON.")
-        response = await llm.ainvoke(
-            [system_message, HumanMessage(content=prompt)]
+        content = await _invoke_llm(
+            "keywords",
+            prompt,
+            model_name,
+            temperature
         )
         
         # Parse the response
-        content = response.content if hasattr(response, 'content') else str(response)
         keywords = InputParser._parse_list_from_response(content)
         
         # Ensure we have 5-6 keywords
-        if len(keywords) < 5:
-            keywords.extend(['automation', 'helper'][:5 - len(keywords)])
-        elif len(keywords) > 6:
-            keywords = keywords[:6]
+        return _normalize_keywords(keywords)
             
-        return keywords
+    except Exception:
+        logger.exception("Error extracting keywords")
+        return ['automation', 'helper', 'assistant']  # Default keywords on error
+
+async def extract_fields_and_keywords(
+    user_input: str,
+    model_name: str = "custom-vlm",
+    temperature: float = 0
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Extract field information and keywords from user input in a single LLM call.
+    
+    Equivalent to extract_fields_from_input followed by extract_keywords_from_agent,
+    but with one round-trip instead of two.
+    
+    The two single-purpose functions are deliberately not wrappers around this
+    one: each is called on its own (/parse-field, /extract-keywords, tool autofill),
+    where generating the other half of the combined answer would only add output
+    tokens, and extract_keywords_from_agent works from an agent name and
+    description rather than raw user input.
+    
+    Args:
+        user_input: The natural language input from the user
+        model_name: The name of the LLM to use
+        temperature: The temperature setting for the model (0-1)
+        
+    Returns:
+        Tuple of (dictionary of extracted field values, list of 5-6 keywords)
+    """
+    prompt = create_fields_and_keywords_prompt(user_input, input_parser.field_descriptions)
+    
+    try:
+        content = await _invoke_llm(
+            "fields_keywords",
+            prompt,
+            model_name,
+            temperature,
+            json_mode=True
+        )
+        
+        # Parse the response once and split it into its two parts
+        result = await _parse_json_async(content)
+        fields = result.get("fields")
+        keywords = result.get("keywords")
+        
+        fields = _apply_field_defaults(fields if isinstance(fields, dict) else {})
+        keywords = [str(keyword) for keyword in keywords] if isinstance(keywords, list) else []
+        
+        return fields, _normalize_keywords(keywords)
             
-    except Exception as e:
-        return ['automation', 'helper', 'assistant']  # Default keywords on error 
+    except Exception:
+        logger.exception("Error extracting fields and keywords")
+        return {}, ['automation', 'helper', 'assistant']
+
+async def parse_and_recommend(
+    user_input: str,
+    model_name: str = "custom-vlm",
+    temperature: float = 0
+) -> Dict[str, Any]:
+    """
+    Parse user input, then extract keywords and fetch MCP tool recommendations concurrently.
+    
+    Keyword extraction needs the parsed agent name and description, but the
+    Compass search runs on the raw input, so both can start as soon as parsing ends.
+    
+    Args:
+        user_input: The natural language input from the user
+        model_name: The name of the LLM to use
+        temperature: The temperature setting for the model (0-1)
+        
+    Returns:
+        Dictionary containing:
+        - fields: Dictionary of extracted field values
+        - keywords: List of 5-6 keywords
+        - recommended_tools: List of recommended MCP tools formatted for the frontend
+    """
+    fields = await extract_fields_from_input(user_input, model_name, temperature)
+    
+    keywords, servers = await asyncio.gather(
+        extract_keywords_from_agent(
+            agent_name=fields.get("agent_name", ""),
+            description=fields.get("description", "") or user_input,
+            model_name=model_name,
+            temperature=temperature
+        ),
+        make_compass_request(user_input)
+    )
+    
+    return {
+        "fields": fields,
+        "keywords": keywords,
+        "recommended_tools": _format_server_for_frontend(servers)
+    }
 
 async def parse_multi_agent_input(
     user_input: str,
@@ -544,18 +967,18 @@ async def parse_multi_agent_input(
         - need_more_info: Whether more information is needed from the user
     """
     try:
-        llm = get_llms(model_name, temperature)
-        
         prompt = create_multi_agent_parsing_prompt(user_input)
         
-        system_message = SystemMessage(content="You are a strict JSON generator. Output only valid JSON. Do not add any conversational text or markdown.")
-        response = await llm.ainvoke(
-            [system_message, HumanMessage(content=prompt)]
+        content = await _invoke_llm(
+            "multi_agent",
+            prompt,
+            model_name,
+            temperature,
+            json_mode=True
         )
         
         # Parse the response
-        content = response.content if hasattr(response, 'content') else str(response)
-        result = InputParser._parse_json_from_response(content)
+        result = await _parse_json_async(content)
         
         # Ensure the response has the expected structure
         if not result:
@@ -568,47 +991,50 @@ async def parse_multi_agent_input(
                 "missing_info": f"Could not parse the input. Raw output: {content[:200]}..." 
             }
             
-        # Set defaults for any missing fields
-        result["has_multi_agent"] = True
-        result.setdefault("agent_count", len(result.get("agent_variations", [])) or 1)
-        result.setdefault("common_attributes", {})
-        result.setdefault("agent_variations", [])
-        result.setdefault("need_more_info", len(result.get("agent_variations", [])) == 0)
-        result.setdefault("missing_info", "" if not result.get("need_more_info") else "Need more details about each agent's specific attributes.")
+        variations = result.get("agent_variations") or []
+        common_attributes = result.get("common_attributes") or {}
+        agent_count = result.get("agent_count", len(variations) or 1)
+        
+        # FORCE need_more_info to False if we have any agents
+        # This overrides LLM hesitation - we prefer to show Draft agents than block the user
+        has_agents = len(variations) > 0 or agent_count > 0
+        if has_agents:
+            need_more_info, missing_info = False, ""
+        else:
+            need_more_info = result.get("need_more_info", True)
+            missing_info = result.get("missing_info", "Need more details about each agent's specific attributes." if need_more_info else "")
         
         # Convert any agent_style to agent_name for consistency
-        if "agent_style" in result["common_attributes"]:
-            result["common_attributes"]["agent_name"] = result["common_attributes"].pop("agent_style")
+        if "agent_style" in common_attributes:
+            common_attributes["agent_name"] = common_attributes.pop("agent_style")
             
         # Ensure each agent variation has agent_name and description
-        for agent in result["agent_variations"]:
+        for agent in variations:
             if "agent_style" in agent and "agent_name" not in agent:
                 agent["agent_name"] = agent.pop("agent_style")
-                
-            if "agent_name" not in agent:
-                agent["agent_name"] = "Unnamed Agent"
-                
-            if "description" not in agent:
-                agent["description"] = "No specific description provided"
-
-        # FORCE need_more_info to False if we have any agents
-        # This overrides LLM hesitation - we prefer to show Draft agents than block the user
-        if len(result["agent_variations"]) > 0 or result.get("agent_count", 0) > 0:
-            result["need_more_info"] = False
-            result["missing_info"] = ""
-            result["has_multi_agent"] = True
+            agent.setdefault("agent_name", "Unnamed Agent")
+            agent.setdefault("description", "No specific description provided")
         
-        return result
+        # Build the final structure in one pass, keeping any extra keys from the LLM
+        result = {
+            **result,
+            "has_multi_agent": True,
+            "agent_count": agent_count,
+            "common_attributes": common_attributes,
+            "agent_variations": variations,
+            "need_more_info": need_more_info,
+            "missing_info": missing_info
+        }
         
         return result
             
-    except Exception as e:
-        print(f"Error parsing multi-agent input: {str(e)}")
+    except Exception:
+        logger.exception("Error parsing multi-agent input")
         return {
             "has_multi_agent": True,
             "agent_count": 1,
             "common_attributes": {},
             "agent_variations": [],
             "need_more_info": True,
-            "missing_info": f"Error analyzing input: {str(e)}"
+            "missing_info": "Error analyzing input. Please try again."
         } 
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+LLM Batch Queue
+
+This module provides a queue that bounds how many LLM calls run at once and, for
+runnables with a native batch endpoint, coalesces requests arriving within a short
+window into a single batched call.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Set, Tuple
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Whether each runnable type implements abatch itself, by type
+_native_batch_types: Dict[type, bool] = {}
+
+def _has_native_batch(llm: Any) -> bool:
+    """
+    Check whether a runnable sends batches to its provider in a single request.
+    
+    The abatch inherited from langchain_core only runs concurrent ainvoke calls,
+    so batching such runnables adds latency without saving any requests.
+    Bindings (e.g. from .bind()) are unwrapped to the runnable they delegate to.
+    """
+    while hasattr(llm, "bound"):
+        llm = llm.bound
+    llm_type = type(llm)
+    native = _native_batch_types.get(llm_type)
+    if native is None:
+        abatch = getattr(llm_type, "abatch", None)
+        module = getattr(abatch, "__module__", "") or ""
+        native = _native_batch_types[llm_type] = abatch is not None and not module.startswith("langchain_core")
+    return native
+
+class LLMBatchQueue:
+    """
+    Caps concurrent LLM calls and coalesces them into `abatch` calls where that helps.
+
+    For runnables with a native batch endpoint, requests for one model instance that
+    arrive within `window` seconds of each other are dispatched together. Other
+    runnables are invoked immediately. At most `max_concurrency` calls or batches
+    are in flight.
+    """
+
+    def __init__(self, max_concurrency: int = 16, window: float = 0.05, max_batch_size: int = 16):
+        """
+        Initialize the queue.
+
+        Args:
+            max_concurrency: Maximum number of batches sent to providers at once
+            window: Seconds to wait for more requests before dispatching a batch
+            max_batch_size: Batch size that triggers an immediate dispatch
+        """
+        self.max_concurrency = max_concurrency
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending: Dict[int, Tuple[Any, List[Tuple[Any, asyncio.Future]]]] = {}
+        # Running dispatch tasks, referenced so they aren't garbage-collected mid-flight
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, llm: Any, messages: Any) -> Any:
+        """
+        Queue one invocation and wait for its result.
+
+        Args:
+            llm: The LLM runnable to invoke (should be a long-lived instance)
+            messages: The input for a single invocation
+
+        Returns:
+            The LLM response for these messages
+        """
+        if not _has_native_batch(llm):
+            async with self._semaphore:
+                return await llm.ainvoke(messages)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = id(llm)
+
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = (llm, [])
+            loop.call_later(self.window, self._schedule_flush, key, batch)
+        batch[1].append((messages, future))
+
+        if len(batch[1]) >= self.max_batch_size:
+            self._schedule_flush(key, batch)
+
+        return await future
+
+    def _schedule_flush(self, key: int, batch: Tuple[Any, list]) -> None:
+        """Detach a pending batch and start dispatching it, unless already dispatched."""
+        if self._pending.get(key) is not batch:
+            return
+        del self._pending[key]
+        task = asyncio.ensure_future(self._dispatch(*batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, llm: Any, items: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Run one batch and resolve each request's future with its own result."""
+        async with self._semaphore:
+            try:
+                if len(items) == 1:
+                    results = [await llm.ainvoke(items[0][0])]
+                else:
+                    results = await llm.abatch([messages for messages, _ in items], return_exceptions=True)
+            except Exception as e:
+                results = [e] * len(items)
+
+        for (_, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+# Create a singleton instance
+llm_batch_queue = LLMBatchQueue(
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+    window=int(os.getenv("LLM_BATCH_WINDOW_MS", "50")) / 1000
+)
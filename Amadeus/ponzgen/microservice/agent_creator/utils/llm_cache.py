@@ -0,0 +1,332 @@
+"""
+LLM Response Cache
+
+This module provides a content-addressable cache for LLM responses. Entries live
+in an in-memory LRU tier and, when a cache directory is configured, in an on-disk
+tier so that responses survive process restarts.
+
+It also provides an opt-in semantic cache that returns a stored result for inputs
+whose embedding is close enough to one seen before.
+"""
+
+import asyncio
+import copy
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import orjson
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Bump whenever a prompt template changes so stale responses are not reused
+PROMPT_VERSION = "v1"
+
+# Default lifetime of a cached response (seconds)
+DEFAULT_TTL = 7 * 86400
+
+# Minimum time between two sweeps of the on-disk tier (seconds)
+DISK_SWEEP_INTERVAL = 3600
+
+class LLMCache:
+    """
+    Async LRU cache with per-entry expiry and an optional JSON-on-disk tier.
+    """
+
+    def __init__(self, maxsize: int = 1024, cache_dir: Optional[str] = None, disk_maxsize: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept in memory
+            cache_dir: Directory for the on-disk tier (disabled if None)
+            disk_maxsize: Maximum number of entries kept on disk
+        """
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.disk_maxsize = disk_maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._last_sweep = 0.0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(namespace: str, *parts: Any) -> str:
+        """
+        Build a cache key from a namespace and the inputs that determine the response.
+
+        Args:
+            namespace: Name of the calling operation (e.g. "fields", "keywords")
+            parts: Values the response depends on (model name, temperature, prompt, ...)
+
+        Returns:
+            Hex SHA-256 digest of the namespace, prompt version and parts
+        """
+        raw = "|".join([namespace, PROMPT_VERSION, *(str(part) for part in parts)])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """Get the on-disk path for a key."""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """Delete a cache file, ignoring files that are already gone."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+        """Read an unexpired (expires_at, value) entry from disk, deleting it if expired."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                entry = orjson.loads(file.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning("Removing unreadable LLM cache entry %s: %s", key, e)
+            self._remove(path)
+            return None
+
+        if entry["expires_at"] <= time.time():
+            self._remove(path)
+            return None
+        return entry["expires_at"], entry["value"]
+
+    def _sweep_disk(self) -> None:
+        """
+        Bound the on-disk tier: delete files older than DEFAULT_TTL (and leftover
+        temporary files), then the oldest files beyond disk_maxsize.
+        """
+        cutoff = time.time() - DEFAULT_TTL
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    try:
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    if mtime <= cutoff or entry.name.endswith(".tmp"):
+                        self._remove(entry.path)
+                    elif entry.name.endswith(".json"):
+                        files.append((mtime, entry.path))
+        except OSError as e:
+            logger.warning("Could not sweep LLM cache directory %s: %s", self.cache_dir, e)
+            return
+
+        if len(files) > self.disk_maxsize:
+            files.sort()
+            for _, path in files[:len(files) - self.disk_maxsize]:
+                self._remove(path)
+
+    def _write_disk(self, key: str, expires_at: float, value: Any) -> None:
+        """Write an entry to disk atomically."""
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as file:
+                file.write(orjson.dumps({"expires_at": expires_at, "value": value}))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            logger.warning("Could not persist LLM cache entry %s: %s", key, e)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        async with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+
+        if not self.cache_dir:
+            return None
+
+        entry = await asyncio.to_thread(self._read_disk, key)
+        if entry is None:
+            return None
+
+        # Promote the disk hit into memory
+        async with self._lock:
+            self._store(key, entry)
+        return entry[1]
+
+    async def set(self, key: str, value: Any, ttl: float = DEFAULT_TTL) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key (see make_key)
+            value: JSON-serializable value to cache
+            ttl: Lifetime of the entry in seconds
+        """
+        expires_at = time.time() + ttl
+        async with self._lock:
+            self._store(key, (expires_at, value))
+
+        if self.cache_dir:
+            await asyncio.to_thread(self._write_disk, key, expires_at, value)
+            if time.time() - self._last_sweep >= DISK_SWEEP_INTERVAL:
+                self._last_sweep = time.time()
+                await asyncio.to_thread(self._sweep_disk)
+
+    def _store(self, key: str, entry: tuple) -> None:
+        """Insert an entry into the memory tier, evicting the least recently used."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache over sentence embeddings.
+
+    Inputs are embedded with a small sentence-transformers model; a lookup returns
+    the stored value of the most similar previous input when the cosine similarity
+    reaches the threshold. Entries are kept per namespace (e.g. per model name).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        threshold: float = 0.92,
+        maxsize: int = 1024,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            enabled: Whether lookups and inserts do anything
+            threshold: Minimum cosine similarity for a hit
+            maxsize: Maximum number of entries kept per namespace
+            model_name: sentence-transformers model used for embeddings
+        """
+        self.enabled = enabled
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.model_name = model_name
+        self._encoder = None
+        # Embeddings run in worker threads, so the model is loaded under a lock
+        self._encoder_lock = threading.Lock()
+        self._vectors: Dict[str, List[np.ndarray]] = {}
+        self._values: Dict[str, List[Any]] = {}
+        self._matrices: Dict[str, np.ndarray] = {}
+
+    def _disable(self, reason: str) -> None:
+        """Turn the cache off after an unrecoverable error, logging it only once."""
+        if self.enabled:
+            self.enabled = False
+            logger.warning("Semantic cache disabled: %s", reason)
+
+    def _get_encoder(self):
+        """Load the embedding model on first use, disabling the cache if unavailable."""
+        if self._encoder is None:
+            with self._encoder_lock:
+                if self._encoder is None and self.enabled:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+                        self._encoder = SentenceTransformer(self.model_name)
+                    except ImportError:
+                        self._disable("sentence-transformers is not installed")
+                    except Exception as e:
+                        self._disable(f"could not load {self.model_name}: {e}")
+        return self._encoder
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed a text as a unit-length vector, or return None if embedding fails."""
+        encoder = self._get_encoder()
+        if encoder is None:
+            return None
+        try:
+            return np.asarray(encoder.encode(text, normalize_embeddings=True), dtype=np.float32)
+        except Exception as e:
+            self._disable(f"embedding failed: {e}")
+            return None
+
+    async def lookup(self, namespace: str, text: str) -> Optional[Any]:
+        """
+        Find the stored value of the most similar previous input.
+
+        Args:
+            namespace: Partition to search (e.g. "fields:<model_name>")
+            text: The input to match
+
+        Returns:
+            A copy of the stored value, or None if nothing is similar enough
+        """
+        if not self.enabled or not self._vectors.get(namespace):
+            return None
+
+        vector = await asyncio.to_thread(self._embed, text)
+        if vector is None:
+            return None
+
+        matrix = self._matrices.get(namespace)
+        if matrix is None:
+            matrix = self._matrices[namespace] = np.vstack(self._vectors[namespace])
+
+        # Vectors are normalized, so the dot product is the cosine similarity
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return copy.deepcopy(self._values[namespace][best])
+
+    async def add(self, namespace: str, text: str, value: Any) -> None:
+        """
+        Store the value produced for an input.
+
+        Args:
+            namespace: Partition to store in
+            text: The input that produced the value
+            value: The value to return for similar inputs
+        """
+        if not self.enabled:
+            return
+
+        vector = await asyncio.to_thread(self._embed, text)
+        if vector is None:
+            return
+
+        vectors = self._vectors.setdefault(namespace, [])
+        values = self._values.setdefault(namespace, [])
+        vectors.append(vector)
+        values.append(copy.deepcopy(value))
+        if len(vectors) > self.maxsize:
+            del vectors[0], values[0]
+        self._matrices.pop(namespace, None)
+
+# Create singleton instances
+llm_cache = LLMCache(
+    maxsize=int(os.getenv("LLM_CACHE_SIZE", "1024")),
+    cache_dir=os.getenv("LLM_CACHE_DIR") or None,
+    disk_maxsize=int(os.getenv("LLM_CACHE_DISK_SIZE", "10000"))
+)
+
+semantic_cache = SemanticCache(
+    enabled=os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true",
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+)
@@ -5,14 +5,57 @@ This module provides async utilities for interacting with the MCP Compass API
 to get server/tool recommendations based on agent descriptions.
 """
 
+import asyncio
 import json
+import logging
 import urllib.parse
 import aiohttp
-import sys
-from typing import Dict, List, Any, Optional
+import orjson
+from typing import Dict, List, Any, Optional, Tuple
+from cachetools import TTLCache
+
+# Configure logger
+logger = logging.getLogger(__name__)
 
 COMPASS_API_BASE = "https://registry.mcphub.io"
 
+# Request compressed JSON; aiohttp decompresses transparently
+COMPASS_REQUEST_HEADERS = {"Accept": "application/json", "Accept-Encoding": "gzip, deflate"}
+
+# Shared HTTP session so Compass requests reuse pooled keep-alive connections
+_session: Optional[aiohttp.ClientSession] = None
+_session_lock = asyncio.Lock()
+
+# Formatted recommendations keyed by the normalized keyword set
+_compass_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+
+# In-flight Compass lookups, so concurrent identical queries share one request
+_compass_inflight: Dict[Tuple[str, ...], asyncio.Task] = {}
+
+async def _get_session() -> aiohttp.ClientSession:
+    """
+    Get or create the shared aiohttp session used for Compass requests.
+    
+    Returns:
+        An open aiohttp.ClientSession
+    """
+    global _session
+    if _session is None or _session.closed:
+        async with _session_lock:
+            if _session is None or _session.closed:
+                _session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300, keepalive_timeout=60),
+                    timeout=aiohttp.ClientTimeout(total=15)
+                )
+    return _session
+
+async def close_session() -> None:
+    """Close the shared Compass session (called on application shutdown)."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
 async def make_compass_request(query: str) -> List[Dict[str, Any]]:
     """
     Makes an async request to the MCP Compass API to get server recommendations.
@@ -25,15 +68,16 @@ async def make_compass_request(query: str) -> List[Dict[str, Any]]:
     """
     try:
         url = f"{COMPASS_API_BASE}/recommend?description={urllib.parse.quote(query)}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    print(f"Error from COMPASS API: Status {response.status}", file=sys.stderr)
-                    return []
-                data = await response.json()
-                return data
+        session = await _get_session()
+        async with session.get(url, headers=COMPASS_REQUEST_HEADERS) as response:
+            if response.status != 200:
+                logger.error("Error from COMPASS API: Status %s", response.status)
+                return []
+            # Decode the raw bytes directly, without an intermediate str
+            data = orjson.loads(await response.read())
+            return data
     except Exception as error:
-        print(f"Error fetching from COMPASS API: {error}", file=sys.stderr)
+        logger.error("Error fetching from COMPASS API: %s", error)
         return []
 
 def _to_servers_text(servers: List[Dict[str, Any]]) -> str:
@@ -49,33 +93,36 @@ def _to_servers_text(servers: List[Dict[str, Any]]) -> str:
     if not servers:
         return "No MCP servers found."
 
-    result = []
-    for i, server in enumerate(servers):
-        # Handle missing keys gracefully
-        title = server.get('title', 'No title available')
-        description = server.get('description', 'No description available')
-        github_url = server.get('github_url', 'No GitHub URL available')
-        
-        # Handle missing similarity or different format
-        try:
-            if 'similarity' in server:
-                similarity_percentage = f"{server['similarity'] * 100:.1f}"
+    def _iter_server_blocks():
+        for i, server in enumerate(servers):
+            # Handle missing keys gracefully
+            title = server.get('title', 'No title available')
+            description = server.get('description', 'No description available')
+            github_url = server.get('github_url', 'No GitHub URL available')
+            
+            # Handle missing similarity or different format
+            similarity = server.get('similarity', 'N/A')
+            if isinstance(similarity, (int, float)):
+                similarity_percentage = f"{similarity * 100:.1f}"
             else:
-                similarity_percentage = "N/A"
-        except (TypeError, ValueError):
-            similarity_percentage = str(server.get('similarity', 'N/A'))
-        
-        server_text = [
-            f"Server {i + 1}:",
-            f"Title: {title}",
-            f"Description: {description}",
-            f"GitHub URL: {github_url}",
-            f"Similarity: {similarity_percentage}%",
-            ""
-        ]
-        result.append("\n".join(server_text))
+                similarity_percentage = str(similarity)
+            
+            yield (
+                f"Server {i + 1}:\n"
+                f"Title: {title}\n"
+                f"Description: {description}\n"
+                f"GitHub URL: {github_url}\n"
+                f"Similarity: {similarity_percentage}%\n"
+            )
     
-    return "\n".join(result)
+    return "\n".join(_iter_server_blocks())
+
+def _to_similarity(value: Any) -> float:
+    """Convert a similarity score to float, using 0.0 for unparseable values."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
 
 def _format_server_for_frontend(servers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
@@ -90,30 +137,16 @@ def _format_server_for_frontend(servers: List[Dict[str, Any]]) -> List[Dict[str,
     if not servers:
         return []
     
-    formatted_servers = []
-    for server in servers:
-        # Extract the relevant fields
-        title = server.get('title', '')
-        description = server.get('description', '')
-        github_url = server.get('github_url', '')
-        
-        # Create formatted server object
-        formatted_server = {
-            "name": title,
-            "description": description,
-            "url": github_url
+    # Similarity is only included when the API returned one
+    return [
+        {
+            "name": server.get('title', ''),
+            "description": server.get('description', ''),
+            "url": server.get('github_url', ''),
+            **({"similarity": _to_similarity(server['similarity'])} if 'similarity' in server else {})
         }
-        
-        # Add similarity if available
-        if 'similarity' in server:
-            try:
-                formatted_server["similarity"] = float(server['similarity'])
-            except (TypeError, ValueError):
-                formatted_server["similarity"] = 0.0
-        
-        formatted_servers.append(formatted_server)
-    
-    return formatted_servers
+        for server in servers
+    ]
 
 async def get_recommended_tools(agent_name: str = "", agent_description: str = "", keywords: List[str] = None) -> List[Dict[str, Any]]:
     """
@@ -131,11 +164,39 @@ async def get_recommended_tools(agent_name: str = "", agent_description: str = "
     if not keywords:
         keywords = ["automation", "helper", "assistant"]  # Default keywords if none provided
     
+    # Keyword order, case and duplicates don't change the recommendations
+    cache_key = tuple(sorted({str(keyword).lower().strip() for keyword in keywords}))
+    cached = _compass_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    task = _compass_inflight.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_recommended_tools(cache_key))
+        _compass_inflight[cache_key] = task
+        task.add_done_callback(lambda _: _compass_inflight.pop(cache_key, None))
+    
+    # Shield so one cancelled caller doesn't cancel the lookup for the others
+    return await asyncio.shield(task)
+
+async def _fetch_recommended_tools(cache_key: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """
+    Query the COMPASS API for a normalized keyword set and cache non-empty results.
+    
+    Args:
+        cache_key: Sorted, deduplicated, lowercased keywords
+        
+    Returns:
+        List of recommended tools formatted for the frontend
+    """
     # Join keywords with spaces for better semantic matching
-    query = " ".join(keywords)
+    query = " ".join(cache_key)
     
     # Make request to COMPASS API
     servers = await make_compass_request(query)
     
     # Format servers for frontend
-    return _format_server_for_frontend(servers) 
\ No newline at end of file
+    formatted_servers = _format_server_for_frontend(servers)
+    if formatted_servers:
+        _compass_cache[cache_key] = formatted_servers
+    return formatted_servers 
\ No newline at end of file
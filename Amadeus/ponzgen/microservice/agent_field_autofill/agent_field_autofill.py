@@ -5,12 +5,18 @@ This module handles field autofill generation using LLMs.
 It is a simplified version of the agent boilerplate, without memory, tools, or other complex features.
 """
 
-from typing import Dict, Any, Optional, AsyncGenerator
-import json
+from typing import Dict, Any, List, Optional, Tuple, AsyncGenerator, AsyncIterator
+import asyncio
+import itertools
+import logging
+import operator
 import os
 import sys
 from datetime import datetime
 
+import orjson
+from cachetools import LRUCache
+
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage
 
@@ -20,8 +26,207 @@ from ..agent_boilerplate.boilerplate.errors import (
     BadRequestError, InternalServerError, ServiceUnavailableError
 )
 from ..agent_boilerplate.boilerplate.utils.custom_vlm_model import get_custom_vlm_model
+from ..agent_boilerplate.boilerplate.utils.get_llms import _get_http_async_client
+from ..agent_creator.utils.llm_cache import llm_cache
 from langchain_core.language_models import LLM
 
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Streamed tokens are coalesced into one SSE frame per this many chunks or
+# milliseconds, whichever comes first
+STREAM_BATCH_MAX_TOKENS = 8
+STREAM_BATCH_MAX_MS = 25
+
+# Maximum number of autofill LLM calls (including open streams) running at once
+AUTOFILL_LLM_MAX_ASYNC = int(os.getenv("AUTOFILL_LLM_MAX_ASYNC", "32"))
+
+def _parse_vlm_endpoints(value: str) -> List[Tuple[str, str]]:
+    """
+    Parse VLM_ENDPOINTS ("base_url|api_key,base_url|api_key,...").
+    
+    Returns:
+        List of (base_url, api_key) pairs; an entry without a key gets an empty key
+    """
+    endpoints = []
+    for entry in value.split(","):
+        entry = entry.strip()
+        if entry:
+            base_url, _, api_key = entry.partition("|")
+            endpoints.append((base_url.strip(), api_key.strip()))
+    return endpoints
+
+# OpenAI-compatible VLM servers to spread autofill traffic over; when none are
+# configured the in-process custom VLM is used
+VLM_ENDPOINTS = _parse_vlm_endpoints(os.getenv("VLM_ENDPOINTS", ""))
+VLM_ENDPOINT_MODEL = os.getenv("VLM_ENDPOINT_MODEL", "google/gemma-2-2b-it")
+
+# Built system prompts, keyed by their inputs
+_system_prompt_cache: LRUCache = LRUCache(maxsize=1024)
+
+def _canonical_json_field(json_field: Dict[str, Any]) -> bytes:
+    """Encode json_field with sorted keys, so equal objects give equal bytes."""
+    return orjson.dumps(json_field, option=orjson.OPT_SORT_KEYS)
+
+def _get_system_prompt(field_name: str, json_field: Dict[str, Any], existing_field_value: str,
+                       json_field_bytes: bytes) -> str:
+    """
+    Get the autofill system prompt, reusing it when the same inputs recur.
+    
+    Args:
+        field_name: The name of the field to generate
+        json_field: JSON object containing other field values
+        existing_field_value: Optional existing value for continuation
+        json_field_bytes: Canonical encoding of json_field (see _canonical_json_field)
+        
+    Returns:
+        System prompt string
+    """
+    key = (field_name, json_field_bytes, existing_field_value)
+    system_prompt = _system_prompt_cache.get(key)
+    if system_prompt is None:
+        system_prompt = construct_system_prompt(field_name, json_field, existing_field_value, load_field_descriptions())
+        _system_prompt_cache[key] = system_prompt
+    return system_prompt
+
+def _try_direct(field_name: str, json_field: Dict[str, Any], existing_field_value: str) -> Optional[str]:
+    """
+    Resolve autofills whose result is known without asking the LLM.
+    
+    Args:
+        field_name: The name of the field to generate
+        json_field: JSON object containing other field values
+        existing_field_value: Optional existing value for continuation
+        
+    Returns:
+        The autofilled value, or None if the LLM is needed
+    """
+    if existing_field_value.strip():
+        # Continuations always need the LLM
+        return None
+    
+    # The field's value was already sent along with the context
+    value = json_field.get(field_name)
+    if isinstance(value, str) and value.strip():
+        return value
+    
+    # Nothing to generate from
+    if not any(value not in (None, "", [], {}) for value in json_field.values()):
+        return ""
+    
+    return None
+
+def _sse_event(event: str, data: Dict[str, Any]) -> bytes:
+    """Format one SSE frame with a JSON payload, as bytes ready to send."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+# The opening status frame never changes, so it is built once
+_PROCESSING_EVENT = _sse_event("status", {"status": "Processing your request"})
+
+async def _batched(stream: AsyncIterator[Any], max_tokens: int = STREAM_BATCH_MAX_TOKENS,
+                   max_ms: float = STREAM_BATCH_MAX_MS) -> AsyncGenerator[str, None]:
+    """
+    Coalesce the text of streamed LLM chunks into larger pieces.
+    
+    A piece is flushed once it holds max_tokens chunks or max_ms have passed
+    since its first chunk, so slow streams still deliver promptly.
+    
+    Args:
+        stream: Async iterator of LLM chunks (objects with .content, or strings)
+        max_tokens: Maximum number of chunks per piece
+        max_ms: Maximum time a chunk waits before being flushed (milliseconds)
+        
+    Yields:
+        Concatenated chunk text
+    """
+    loop = asyncio.get_running_loop()
+    iterator = stream.__aiter__()
+    buffer = []
+    deadline = None
+    extract = None
+    next_chunk = asyncio.ensure_future(iterator.__anext__())
+    try:
+        while True:
+            timeout = None if deadline is None else max(deadline - loop.time(), 0)
+            done, _ = await asyncio.wait({next_chunk}, timeout=timeout)
+            if not done:
+                # Window expired while waiting; flush and keep waiting for the same chunk
+                yield "".join(buffer)
+                buffer.clear()
+                deadline = None
+                continue
+            
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            if extract is None:
+                # A stream yields one chunk type, so resolve how to read it once
+                extract = operator.attrgetter('content') if hasattr(chunk, 'content') else str
+            content = extract(chunk)
+            if content:
+                if not buffer:
+                    deadline = loop.time() + max_ms / 1000
+                buffer.append(content)
+            
+            if len(buffer) >= max_tokens:
+                yield "".join(buffer)
+                buffer.clear()
+                deadline = None
+            next_chunk = asyncio.ensure_future(iterator.__anext__())
+    finally:
+        if not next_chunk.done():
+            next_chunk.cancel()
+    
+    if buffer:
+        yield "".join(buffer)
+
+# Maximum number of pieces buffered between the LLM stream and the SSE sender
+STREAM_QUEUE_MAXSIZE = 64
+
+# Marks the end of a decoupled stream
+_STREAM_END = object()
+
+async def _decoupled(stream: AsyncIterator[Any], maxsize: int = STREAM_QUEUE_MAXSIZE) -> AsyncGenerator[Any, None]:
+    """
+    Pull from a stream in a background task so a slow consumer doesn't stall it.
+    
+    Items pass through a bounded queue, which applies backpressure once the
+    consumer falls maxsize items behind. An exception raised by the stream is
+    re-raised to the consumer after the items produced before it.
+    
+    Args:
+        stream: Async iterator to pull from
+        maxsize: Maximum number of buffered items
+        
+    Yields:
+        Items of the stream, in order
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    
+    async def _produce():
+        try:
+            async for item in stream:
+                await queue.put(item)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_STREAM_END)
+    
+    producer = asyncio.create_task(_produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Stop pulling if the consumer went away (e.g. client disconnected)
+        if not producer.done():
+            producer.cancel()
+
 class AgentFieldAutofill:
     """
     Handles field autofill generation using LLMs.
@@ -30,7 +235,35 @@ class AgentFieldAutofill:
     
     def __init__(self):
         """Initialize the AgentFieldAutofill."""
-        pass
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Round-robin iterators over the endpoint clients, one per temperature
+        self._endpoint_clients: Dict[float, Any] = {}
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore capping concurrent LLM calls, created on first use inside the event loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(AUTOFILL_LLM_MAX_ASYNC)
+        return self._semaphore
+    
+    async def startup(self) -> None:
+        """
+        Create shared resources inside the running event loop (called on application startup).
+        
+        The semaphore and field descriptions are otherwise created lazily by the first request.
+        """
+        self._semaphore = asyncio.Semaphore(AUTOFILL_LLM_MAX_ASYNC)
+        await asyncio.to_thread(load_field_descriptions)
+    
+    async def shutdown(self) -> None:
+        """
+        Release shared resources (called on application shutdown).
+        
+        The endpoint clients use the shared LLM HTTP client, which is closed
+        separately by close_http_async_client.
+        """
+        self._endpoint_clients.clear()
+        self._semaphore = None
     
     def get_llm(self, model_name: str = "custom-vlm", temperature: float = 0) -> LLM:
         """
@@ -41,16 +274,37 @@ class AgentFieldAutofill:
             temperature: The temperature setting for the model (0-1)
             
         Returns:
-            A configured ChatOpenAI instance
+            The next VLM endpoint client in round-robin order, or the custom VLM
+            instance when no endpoints are configured
         """
         try:
-            print(f"Initializing LLM: Using Custom VLM instead of {model_name}")
+            if VLM_ENDPOINTS:
+                temperature = round(float(temperature), 3)
+                clients = self._endpoint_clients.get(temperature)
+                if clients is None:
+                    clients = self._endpoint_clients[temperature] = itertools.cycle([
+                        ChatOpenAI(
+                            api_key=api_key or "EMPTY",
+                            base_url=base_url,
+                            model=VLM_ENDPOINT_MODEL,
+                            temperature=temperature,
+                            streaming=True,
+                            http_async_client=_get_http_async_client()
+                        )
+                        for base_url, api_key in VLM_ENDPOINTS
+                    ])
+                # Requests run on a single event loop thread, so next() needs no lock
+                return next(clients)
+            
+            logger.debug("Initializing LLM: Using Custom VLM instead of %s", model_name)
             return get_custom_vlm_model()
         except Exception as e:
             raise InternalServerError(f"Failed to initialize LLM: {str(e)}")
     
     async def generate_autofill(self, field_name: str, json_field: Dict[str, Any], existing_field_value: str = "",
-                                model_name: str = "custom-vlm", temperature: float = 0.7) -> Dict[str, Any]:
+                                model_name: str = "custom-vlm", temperature: float = 0.7,
+                                use_cache: Optional[bool] = None,
+                                json_field_bytes: Optional[bytes] = None) -> Dict[str, Any]:
         """
         Generate a field autofill based on other field values.
         
@@ -59,6 +313,9 @@ class AgentFieldAutofill:
             json_field: JSON object containing other field values
             model_name: The name of the LLM to use
             temperature: The temperature setting for the model (0-1)
+            use_cache: Whether to reuse the response of an identical earlier request
+                       (defaults to caching only deterministic, temperature 0 calls)
+            json_field_bytes: json_field encoded with sorted keys, if the caller already has it
             
         Returns:
             Dictionary containing the autofilled value
@@ -69,10 +326,37 @@ class AgentFieldAutofill:
         if not isinstance(json_field, dict):
             raise BadRequestError("json_field must be a valid JSON object")
         
+        direct_value = _try_direct(field_name, json_field, existing_field_value)
+        if direct_value is not None:
+            return {
+                "field_name": field_name,
+                "autofilled_value": direct_value,
+                "reasoning": None
+            }
+        
+        if use_cache is None:
+            use_cache = temperature == 0
+        
+        if json_field_bytes is None:
+            json_field_bytes = _canonical_json_field(json_field)
+        
         try:
-            # Load field descriptions and construct the system prompt
-            field_descriptions = load_field_descriptions()
-            system_prompt = construct_system_prompt(field_name, json_field, existing_field_value, field_descriptions)
+            # Construct (or reuse) the system prompt
+            system_prompt = _get_system_prompt(field_name, json_field, existing_field_value, json_field_bytes)
+            
+            # Return the stored value for identical prompts; keying on the built
+            # prompt keeps entries from outliving a change to the field descriptions
+            # or the prompt template
+            cache_key = None
+            if use_cache:
+                cache_key = llm_cache.make_key("autofill", model_name, temperature, system_prompt)
+                cached = await llm_cache.get(cache_key)
+                if cached is not None:
+                    return {
+                        "field_name": field_name,
+                        "autofilled_value": cached,
+                        "reasoning": None
+                    }
             
             # Get the LLM
             llm = self.get_llm(model_name, temperature)
@@ -80,7 +364,8 @@ class AgentFieldAutofill:
             # Generate the autofill
             try:
                 # Pass system_prompt string directly to avoid list[BaseMessage] -> string formatting issues
-                response = await llm.ainvoke(system_prompt)
+                async with self.semaphore:
+                    response = await llm.ainvoke(system_prompt)
             except Exception as e:
                 raise ServiceUnavailableError(
                     f"LLM service failed to respond: {str(e)}",
@@ -89,6 +374,8 @@ class AgentFieldAutofill:
             
             # Handle response type (ChatModel returns AIMessage, LLM returns str)
             content = response.content if hasattr(response, 'content') else str(response)
+            if cache_key is not None and content:
+                await llm_cache.set(cache_key, content)
 
             # Return the autofill
             return {
@@ -101,6 +388,7 @@ class AgentFieldAutofill:
             raise
         except Exception as e:
             # Catch any unexpected errors
+            logger.exception("Failed to generate autofill for %s", field_name)
             raise InternalServerError(
                 f"Failed to generate autofill: {str(e)}",
                 additional_info={
@@ -111,7 +399,8 @@ class AgentFieldAutofill:
     
     async def generate_autofill_stream(self, field_name: str, json_field: Dict[str, Any], existing_field_value: str = "",
                                      model_name: str = "custom-vlm", 
-                                     temperature: float = 0.7) -> AsyncGenerator[str, None]:
+                                     temperature: float = 0.7,
+                                     json_field_bytes: Optional[bytes] = None) -> AsyncGenerator[bytes, None]:
         """
         Generate a field autofill with streaming response.
         
@@ -120,9 +409,10 @@ class AgentFieldAutofill:
             json_field: JSON object containing other field values
             model_name: The name of the LLM to use
             temperature: The temperature setting for the model (0-1)
+            json_field_bytes: json_field encoded with sorted keys, if the caller already has it
             
         Yields:
-            Streaming response chunks
+            Encoded SSE frames
         """
         if not field_name:
             raise BadRequestError("Field name cannot be empty")
@@ -130,47 +420,62 @@ class AgentFieldAutofill:
         if not isinstance(json_field, dict):
             raise BadRequestError("json_field must be a valid JSON object")
         
+        direct_value = _try_direct(field_name, json_field, existing_field_value)
+        if direct_value is not None:
+            yield _PROCESSING_EVENT
+            if direct_value:
+                yield _sse_event("token", {"token": direct_value})
+            yield _sse_event("status", {
+                "status": "Autofill Complete",
+                "field_name": field_name,
+                "autofilled_value": direct_value
+            })
+            return
+        
         try:
-            # Load field descriptions and construct the system prompt
-            field_descriptions = load_field_descriptions()
-            system_prompt = construct_system_prompt(field_name, json_field, existing_field_value, field_descriptions)
+            if json_field_bytes is None:
+                json_field_bytes = _canonical_json_field(json_field)
+            
+            # Construct (or reuse) the system prompt
+            system_prompt = _get_system_prompt(field_name, json_field, existing_field_value, json_field_bytes)
             
             # Get the LLM
             llm = self.get_llm(model_name, temperature)
             
             # Start the stream (no thread_id needed)
-            yield f"event: status\ndata: {json.dumps({'status': 'Processing your request'})}\n\n"
+            yield _PROCESSING_EVENT
             
             # Stream the response
-            full_response = ""
+            parts: List[str] = []
             try:
                 # Pass system_prompt string directly
-                async for chunk in llm.astream(system_prompt):
-                    content = chunk.content if hasattr(chunk, 'content') else str(chunk)
-                    if content:
-                        full_response += content
-                        yield f"event: token\ndata: {json.dumps({'token': content})}\n\n"
+                async with self.semaphore:
+                    async for content in _decoupled(_batched(llm.astream(system_prompt))):
+                        parts.append(content)
+                        yield _sse_event("token", {"token": content})
             except Exception as e:
                 error_message = f"LLM streaming failed: {str(e)}"
-                yield f"event: error\ndata: {json.dumps({'error': error_message})}\n\n"
+                yield _sse_event("error", {"error": error_message})
                 raise ServiceUnavailableError(
                     error_message,
                     additional_info={"model": model_name}
                 )
             
             # Signal end of execution with the final response (no thread_id needed)
+            full_response = "".join(parts)
             end_data = {
                 "status": "Autofill Complete",
                 "field_name": field_name,
                 "autofilled_value": full_response
             }
-            yield f"event: status\ndata: {json.dumps(end_data)}\n\n"
+            yield _sse_event("status", end_data)
         except Exception as e:
             # This error handling is only for non-streaming errors
             # For streaming errors, we yield an error event and then raise
             if not isinstance(e, ServiceUnavailableError):
+                logger.exception("Failed to generate autofill stream for %s", field_name)
                 error_message = f"Failed to generate autofill stream: {str(e)}"
-                yield f"event: error\ndata: {json.dumps({'error': error_message})}\n\n"
+                yield _sse_event("error", {"error": error_message})
                 raise InternalServerError(
                     error_message,
                     additional_info={
@@ -5,9 +5,9 @@ This module provides routes for field autofill generation.
 """
 
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from typing import Dict, Any
-import json
+import orjson
 from supabase import Client
 from pydantic import ValidationError as PydanticValidationError
 
@@ -22,9 +22,27 @@ from ...agent_boilerplate.boilerplate.errors import (
 router = APIRouter(
     prefix="/agent-field-autofill",
     tags=["agent-field-autofill"],
-    responses={**ERROR_RESPONSES}
+    responses={**ERROR_RESPONSES},
+    default_response_class=ORJSONResponse
 )
 
+def _parse_recommendation_input(body: bytes) -> RecommendationInput:
+    """
+    Parse and validate a JSON request body in a single pass.
+    
+    Args:
+        body: Raw request body
+        
+    Returns:
+        The validated RecommendationInput
+    """
+    try:
+        return RecommendationInput.model_validate_json(body)
+    except PydanticValidationError as e:
+        if any(error["type"] == "json_invalid" for error in e.errors()):
+            raise BadRequestError("Invalid JSON in request body")
+        raise handle_pydantic_validation_error(e)
+
 # Dependency to get Supabase client
 def get_supabase_client(request: Request):
     return request.app.state.supabase
@@ -40,14 +58,8 @@ async def invoke_autofill(
     This endpoint takes a field name and JSON field values and returns an autofilled value for the field.
     """
     try:
-        # Try to parse and validate the input
-        try:
-            data = await request.json()
-            recommendation_input = RecommendationInput(**data)
-        except PydanticValidationError as e:
-            raise handle_pydantic_validation_error(e)
-        except json.JSONDecodeError:
-            raise BadRequestError("Invalid JSON in request body")
+        # Parse and validate the input
+        recommendation_input = _parse_recommendation_input(await request.body())
             
         # Get user_id from request state (set by middleware)
         user_id = request.state.user_id
@@ -60,12 +72,18 @@ async def invoke_autofill(
         json_field = recommendation_input.json_field
         existing_field_value = recommendation_input.existing_field_value
         
+        # Optional ?cache=true|false overrides the default (cache only temperature 0 calls)
+        cache_param = request.query_params.get("cache")
+        use_cache = None if cache_param is None else cache_param.lower() in ("1", "true", "yes")
+        
         # Generate the autofill
         try:
             response = await agent_field_autofill.generate_autofill(
                 field_name=field_name,
                 json_field=json_field,
-                existing_field_value=existing_field_value
+                existing_field_value=existing_field_value,
+                use_cache=use_cache,
+                json_field_bytes=orjson.dumps(json_field, option=orjson.OPT_SORT_KEYS)
             )
         except Exception as e:
             raise InternalServerError(f"Failed to generate autofill: {str(e)}")
@@ -102,7 +120,7 @@ async def invoke_autofill_stream(
             try:
                 field_name = request.query_params.get("field_name", "")
                 json_field_str = request.query_params.get("json_field", "{}")
-                json_field = json.loads(json_field_str)
+                json_field = orjson.loads(json_field_str)
                 existing_field_value = request.query_params.get("existing_field_value", "")
                 
                 # Get token from query parameters for EventSource authentication
@@ -114,26 +132,15 @@ async def invoke_autofill_stream(
                 if not field_name:
                     raise BadRequestError("field_name is required")
                 
-                # Validate using the model
-                try:
-                    recommendation_input = RecommendationInput(
-                        field_name=field_name,
-                        json_field=json_field,
-                        existing_field_value=existing_field_value
-                    )
-                except PydanticValidationError as e:
-                    raise handle_pydantic_validation_error(e)
-            except json.JSONDecodeError:
+                # Query params are already strings, so json_field is the only value
+                # that needs checking; building a RecommendationInput would only re-validate
+                if not isinstance(json_field, dict):
+                    raise BadRequestError("json_field must be a valid JSON object")
+            except orjson.JSONDecodeError:
                 raise BadRequestError("Invalid JSON in json_field parameter")
         else:
             # This is a POST request with a JSON body
-            try:
-                data = await request.json()
-                recommendation_input = RecommendationInput(**data)
-            except PydanticValidationError as e:
-                raise handle_pydantic_validation_error(e)
-            except json.JSONDecodeError:
-                raise BadRequestError("Invalid JSON in request body")
+            recommendation_input = _parse_recommendation_input(await request.body())
                 
             field_name = recommendation_input.field_name
             json_field = recommendation_input.json_field
@@ -144,7 +151,8 @@ async def invoke_autofill_stream(
             agent_field_autofill.generate_autofill_stream(
                 field_name=field_name,
                 json_field=json_field,
-                existing_field_value=existing_field_value
+                existing_field_value=existing_field_value,
+                json_field_bytes=orjson.dumps(json_field, option=orjson.OPT_SORT_KEYS)
             ),
             media_type="text/event-stream",
             headers={
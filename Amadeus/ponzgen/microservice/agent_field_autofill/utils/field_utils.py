@@ -5,26 +5,62 @@ This module provides utilities for working with field descriptions and autofills
 """
 
 import json
+import logging
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+_FIELD_DESC_PATH = Path("config/field_desc.json")
+
+@lru_cache(maxsize=1)
+def _read_field_descriptions() -> Dict[str, str]:
+    """
+    Read and parse the field descriptions config file.
+    
+    Raises instead of returning a fallback, so lru_cache only keeps a
+    successful load and a failed one is retried on the next call.
+    """
+    with open(_FIELD_DESC_PATH, "r") as file:
+        return json.load(file)
 
 def load_field_descriptions() -> Dict[str, str]:
     """
     Load field descriptions from the config file.
     
+    A successful load is cached for the lifetime of the process, and prompts
+    and payloads built from it are cached too, so edits to the config file
+    take effect on restart. The returned dictionary is shared between callers
+    and must not be mutated.
+    
+    Returns:
+        Dictionary mapping field names to their descriptions, or an empty
+        dictionary if the file is missing or cannot be parsed
+    """
+    try:
+        return _read_field_descriptions()
+    except FileNotFoundError:
+        logger.warning("Field description file not found at %s. Using empty descriptions.", _FIELD_DESC_PATH)
+        return {}
+    except Exception:
+        logger.exception("Error loading field descriptions")
+        return {}
+
+@lru_cache(maxsize=1)
+def _read_field_names() -> Tuple[str, ...]:
+    """Get the field names from a successful load; raises like _read_field_descriptions."""
+    return tuple(_read_field_descriptions())
+
+def load_field_names() -> Tuple[str, ...]:
+    """
+    Get the names of all described fields.
+    
     Returns:
-        Dictionary mapping field names to their descriptions
+        Tuple of field names in config file order
     """
     try:
-        field_desc_path = Path("config/field_desc.json")
-        if not field_desc_path.exists():
-            print(f"Warning: Field description file not found at {field_desc_path}. Using empty descriptions.")
-            return {}
-            
-        with open(field_desc_path, "r") as file:
-            field_descriptions = json.load(file)
-        return field_descriptions
-    except Exception as e:
-        print(f"Error loading field descriptions: {e}")
-        return {}
\ No newline at end of file
+        return _read_field_names()
+    except Exception:
+        return tuple(load_field_descriptions())
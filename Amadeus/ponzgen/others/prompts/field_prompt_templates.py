@@ -2,8 +2,11 @@
 Prompt templates for field autofill.
 """
 
+import logging
 from typing import Dict, Any, Optional
 
+logger = logging.getLogger(__name__)
+
 def construct_system_prompt(
     field_name: str, 
     json_field: Dict[str, Any], 
@@ -52,5 +55,5 @@ def construct_system_prompt(
         f"- **Field Definition**: {target_field_desc}\n"
     )
     
-    print(system_prompt)
+    logger.debug("Autofill system prompt:\n%s", system_prompt)
     return system_prompt
\ No newline at end of file
@@ -6,13 +6,15 @@ This module provides prompt templates for the input parser module.
 
 from typing import Dict, Any, List
 
-def create_extraction_prompt(user_input: str, field_descriptions: Dict[str, str]) -> str:
+def create_extraction_prompt(user_input: str, field_descriptions: Dict[str, str], line_delimited: bool = False) -> str:
     """
     Create a prompt for extracting field information from user input.
     
     Args:
         user_input: The natural language input from the user
         field_descriptions: Dictionary mapping field names to their descriptions
+        line_delimited: Whether to ask for one JSON object per field, one per line
+                        (used for streaming) instead of a single JSON object
         
     Returns:
         Prompt string for the LLM
@@ -35,12 +37,20 @@ def create_extraction_prompt(user_input: str, field_descriptions: Dict[str, str]
         "1. Only extract information for fields that are explicitly or implicitly mentioned in the user input.",
         "2. For each mentioned field, extract relevant information if present in the user input.",
         "3. Return only the extracted information, not explanations or reasoning.",
-        "4. Format your response as a valid JSON object with the field names as keys.",
+        (
+            '4. Emit each extracted field as a standalone JSON object of the form {"field": "<field name>", "value": <value>} on its own line.'
+            if line_delimited else
+            "4. Format your response as a valid JSON object with the field names as keys."
+        ),
         "5. For the 'agent_style' field, create an agent style that will be used to generate the agent's behavior.",
         "6. For the 'description' field, you MUST provide a concise one-sentence summary about the agent's purpose and capabilities, even if there's limited information. Never leave this field empty. Default description: This agent is designed to assist users with their tasks.",
         
         "\n### Response Format ###",
-        "Only return the JSON object. Do not wrap it in markdown code blocks. Do not add any conversational text."
+        (
+            "Only return the JSON lines, one object per line. Do not wrap them in an outer object or in markdown code blocks. Do not add any conversational text."
+            if line_delimited else
+            "Only return the JSON object. Do not wrap it in markdown code blocks. Do not add any conversational text."
+        )
     ])
     
     return "\n".join(prompt_parts)
@@ -77,6 +87,46 @@ def create_keyword_extraction_prompt(agent_name: str, description: str) -> str:
     Only return the JSON array. Do not wrap it in markdown code blocks. Do not add any conversational text.
     """
 
+def create_fields_and_keywords_prompt(user_input: str, field_descriptions: Dict[str, str]) -> str:
+    """
+    Create a prompt for extracting field information and keywords in a single call.
+    
+    Args:
+        user_input: The natural language input from the user
+        field_descriptions: Dictionary mapping field names to their descriptions
+        
+    Returns:
+        Prompt string for the LLM
+    """
+    prompt_parts = [
+        "### Task ###",
+        "Extract information for the following fields from the user input, then extract 5-6 keywords that best represent the described agent.\n",
+        
+        "### Field Descriptions ###"
+    ]
+    
+    for field, description in field_descriptions.items():
+        prompt_parts.append(f"- {field}: {description}")
+    
+    prompt_parts.extend([
+        "\n### User Input ###",
+        user_input,
+        
+        "\n### Instructions ###",
+        "1. Only extract information for fields that are explicitly or implicitly mentioned in the user input.",
+        "2. For each mentioned field, extract relevant information if present in the user input.",
+        "3. For the 'agent_style' field, create an agent style that will be used to generate the agent's behavior.",
+        "4. For the 'description' field, you MUST provide a concise one-sentence summary about the agent's purpose and capabilities, even if there's limited information. Never leave this field empty. Default description: This agent is designed to assist users with their tasks.",
+        "5. Keywords must be 5-6 lowercase, specific, single words relevant to the agent's field and functionality.",
+        "6. Do not include stop words or generic terms like \"agent\" or \"assistant\" or \"solver\" as keywords.",
+        
+        "\n### Response Format ###",
+        'Return a single JSON object of the form {"fields": {<field name>: <value>, ...}, "keywords": [<keyword>, ...]}.',
+        "Only return the JSON object. Do not wrap it in markdown code blocks. Do not add any conversational text."
+    ])
+    
+    return "\n".join(prompt_parts)
+
 def create_multi_agent_parsing_prompt(user_input: str) -> str:
     """
     Create a prompt for parsing multi-agent input.
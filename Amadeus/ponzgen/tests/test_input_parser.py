@@ -0,0 +1,80 @@
+"""
+Tests for the agent creator input parser's line-delimited field stream.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_openai")
+
+from microservice.agent_creator.utils import input_parser
+from microservice.agent_creator.utils.input_parser import InputParser
+
+# A single pretty-printed object, as returned by models that ignore the
+# line-delimited instructions; its array element lines are JSON objects themselves
+PRETTY_PRINTED_ANSWER = """{
+  "agent_name": "Mail Helper",
+  "description": "Sorts and answers email",
+  "agent_style": "Friendly",
+  "servers": [
+    {"name": "gmail", "description": "Gmail server"},
+    {"name": "calendar", "description": "Calendar server"}
+  ]
+}"""
+
+class _Chunk:
+    def __init__(self, content: str):
+        self.content = content
+
+class _FakeStreamingLLM:
+    """Streams a fixed answer in small chunks."""
+    
+    def __init__(self, answer: str, chunk_size: int = 7):
+        self.answer = answer
+        self.chunk_size = chunk_size
+    
+    async def astream(self, messages):
+        for i in range(0, len(self.answer), self.chunk_size):
+            yield _Chunk(self.answer[i:i + self.chunk_size])
+
+def _collect_stream(monkeypatch, answer: str) -> dict:
+    """Run extract_fields_from_input_stream over a fake answer and merge its updates."""
+    monkeypatch.setattr(input_parser, "get_cached_llms", lambda *args: _FakeStreamingLLM(answer))
+    
+    async def _run():
+        merged = {}
+        async for update in input_parser.extract_fields_from_input_stream("an email agent"):
+            merged.update(update)
+        return merged
+    
+    return asyncio.run(_run())
+
+def test_parse_field_line_accepts_field_value_records():
+    assert InputParser._parse_field_line('{"field": "agent_name", "value": "Mail Helper"},') == {"agent_name": "Mail Helper"}
+
+def test_parse_field_line_ignores_other_objects():
+    assert InputParser._parse_field_line('    {"name": "gmail", "description": "Gmail server"},') is None
+
+def test_parse_field_line_rejects_non_string_field():
+    assert InputParser._parse_field_line('{"field": ["a"], "value": 1}') is None
+    assert InputParser._parse_field_line('{"field": null, "value": 1}') is None
+
+def test_stream_falls_back_to_object_parse_for_pretty_printed_answer(monkeypatch):
+    result = _collect_stream(monkeypatch, PRETTY_PRINTED_ANSWER)
+    
+    assert result["agent_name"] == "Mail Helper"
+    assert result["description"] == "Sorts and answers email"
+    assert result["agent_style"] == "Friendly"
+    assert "name" not in result
+
+def test_stream_parses_field_value_lines(monkeypatch):
+    answer = (
+        '{"field": "agent_name", "value": "Mail Helper"}\n'
+        '{"field": ["bad"], "value": 1}\n'
+        '{"field": "agent_style", "value": "Friendly"}'
+    )
+    result = _collect_stream(monkeypatch, answer)
+    
+    assert result == {"agent_name": "Mail Helper", "agent_style": "Friendly"}